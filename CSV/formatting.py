@@ -0,0 +1,95 @@
+import pandas as pd
+
+# pyarrow é opcional: lê o CSV em várias threads e só materializa as colunas pedidas
+try:
+    import pyarrow  # noqa: F401
+    MOTOR_LEITURA = "pyarrow"
+except ImportError:
+    MOTOR_LEITURA = "c"
+
+# Colunas mantidas no arquivo formatado, na ordem de saída
+COLUNAS_PARA_MANTER = [
+    "navigation_id",
+    "titulo",
+    "descrição",
+    "ativo",
+    "tipo de produto",
+    "id da categoria pai",
+    "id da subcategoria",
+    "link do produto"
+]
+
+def validar_colunas(file_path, colunas=COLUNAS_PARA_MANTER):
+    """Lê só o cabeçalho e levanta ValueError se faltar alguma das `colunas`"""
+    colunas_existentes = pd.read_csv(file_path, nrows=0).columns.tolist()
+    colunas_faltantes = [coluna for coluna in colunas if coluna not in colunas_existentes]
+
+    if colunas_faltantes:
+        raise ValueError(
+            f"Colunas não encontradas no arquivo:\n{', '.join(colunas_faltantes)}\n\n"
+            f"Colunas disponíveis:\n{', '.join(colunas_existentes)}"
+        )
+
+def ler_colunas_formatacao(file_path, colunas=COLUNAS_PARA_MANTER, motor=None):
+    """
+    Lê apenas as `colunas` do CSV, todas como texto, na ordem pedida.
+
+    As colunas são validadas antes pelo cabeçalho, então as demais nunca são
+    interpretadas nem ficam na memória. Ler como texto evita a inferência de
+    tipos e preserva os valores como estão no arquivo (ex.: zeros à esquerda).
+    """
+    validar_colunas(file_path, colunas)
+    df = pd.read_csv(file_path, usecols=colunas, dtype=str, engine=motor or MOTOR_LEITURA)
+    return df[colunas]
+
+# Linhas lidas por vez na formatação em streaming
+LINHAS_POR_BLOCO = 100_000
+LINK_BACKOFFICE = 'https://enrichment-backoffice.magalu.com/product-enrichment/'
+
+def formatar_dataframe(df):
+    """
+    Aplica a formatação ao DataFrame: mantém as colunas, preenche vazios e
+    adiciona `link_backoffice`. A concatenação é vetorizada (sem laço Python).
+    """
+    df_formatado = df[COLUNAS_PARA_MANTER].fillna("")
+    # Soma de arrays de objetos: roda no numpy, sem depender do backend de strings do pandas
+    ids = df_formatado['navigation_id'].astype(str).to_numpy(dtype=object)
+    df_formatado['link_backoffice'] = LINK_BACKOFFICE + ids + '/edit'
+    return df_formatado
+
+def iterar_blocos_formatados(file_path, linhas_por_bloco=LINHAS_POR_BLOCO):
+    """
+    Gera o CSV formatado em blocos de até `linhas_por_bloco` linhas.
+
+    A memória usada depende só do tamanho do bloco. A leitura em blocos usa o
+    motor C do pandas (o motor pyarrow não suporta `chunksize`).
+    """
+    validar_colunas(file_path)
+    leitor = pd.read_csv(file_path, usecols=COLUNAS_PARA_MANTER, dtype=str, chunksize=linhas_por_bloco)
+    with leitor:
+        for bloco in leitor:
+            yield formatar_dataframe(bloco)
+
+def formatar_arquivo(file_path, destino, linhas_por_bloco=LINHAS_POR_BLOCO,
+                     callback_progresso=None, deve_parar=None):
+    """
+    Grava em `destino` o CSV formatado, bloco a bloco.
+
+    `callback_progresso(linhas_gravadas)` é chamado após cada bloco.
+    Retorna o número de linhas gravadas.
+    """
+    # Valida antes de abrir o destino: colunas faltando não deixam um arquivo vazio para trás
+    validar_colunas(file_path)
+    linhas_gravadas = 0
+    cabecalho_gravado = False
+    with open(destino, 'w', encoding='utf-8', newline='') as saida:
+        for bloco in iterar_blocos_formatados(file_path, linhas_por_bloco):
+            if deve_parar and deve_parar():
+                break
+            bloco.to_csv(saida, index=False, header=not cabecalho_gravado)
+            cabecalho_gravado = True
+            linhas_gravadas += len(bloco)
+            if callback_progresso:
+                callback_progresso(linhas_gravadas)
+
+    return linhas_gravadas
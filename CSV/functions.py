@@ -1,9 +1,56 @@
-import pandas as pd
 import os
+import math
+import time
 from PySide6.QtWidgets import QFileDialog, QMessageBox, QInputDialog
+from PySide6.QtCore import QThread, Signal
+from CSV.split import (contar_registros_csv, dividir_csv_em_partes, dividir_csv_por_tamanho,
+                       dividir_csv_por_coluna, estimar_registros_csv, ler_colunas)
+from CSV.merge import juntar_csvs, ler_cabecalhos
+from CSV.formatting import (COLUNAS_PARA_MANTER, formatar_arquivo, formatar_dataframe,
+                            iterar_blocos_formatados, ler_colunas_formatacao, validar_colunas)
+from CSV.sheets import (ARQUIVO_CREDENCIAIS, COLUNA_CHAVE, abrir_planilha, obter_cliente,
+                        reescrever_aba, sincronizar_aba)
+
+# Modos de divisão oferecidos ao usuário
+MODO_POR_LINHAS = "Por número de linhas"
+MODO_POR_TAMANHO = "Por tamanho máximo (MB)"
+MODO_POR_COLUNA = "Um arquivo por valor de coluna"
+MODOS_DIVISAO = [MODO_POR_LINHAS, MODO_POR_TAMANHO, MODO_POR_COLUNA]
+SEM_DEDUPLICACAO = "(não remover duplicatas)"
+
+class CsvWorker(QThread):
+    """
+    Thread para operações de CSV em background
+    
+    Recebe uma tarefa `tarefa(callback_progresso, deve_parar) -> mensagem final`,
+    montada pelas funções deste módulo depois de coletar as opções na interface.
+    """
+    progress_signal = Signal(int, int, str)  # (atual, total, mensagem)
+    finished_signal = Signal(str)  # mensagem final
+    error_signal = Signal(str)  # mensagem de erro
+    
+    def __init__(self, tarefa):
+        super().__init__()
+        self.tarefa = tarefa
+        self.is_running = True
+    
+    def run(self):
+        try:
+            mensagem = self.tarefa(self.progress_signal.emit, lambda: not self.is_running)
+            self.finished_signal.emit(mensagem)
+        except Exception as e:
+            self.error_signal.emit(f"❌ {str(e)}")
+    
+    def stop(self):
+        """Pede o cancelamento da operação em andamento"""
+        self.is_running = False
 
 def dividir_csv(parent_window):
-    """Função para dividir um arquivo CSV em partes com número específico de linhas"""
+    """
+    Função para dividir um arquivo CSV por número de linhas, tamanho em MB ou valor de coluna
+    
+    Coleta as opções na interface e retorna a tarefa para o CsvWorker (ou None se cancelado).
+    """
     try:
         # Abrir diálogo para selecionar arquivo
         file_path, _ = QFileDialog.getOpenFileName(
@@ -16,74 +63,212 @@ def dividir_csv(parent_window):
         if not file_path:
             return
         
-        # Ler o arquivo CSV
-        df = pd.read_csv(file_path)
-        total_linhas = len(df)
-        
-        # Perguntar o número de linhas por arquivo
-        linhas_por_arquivo, ok = QInputDialog.getInt(
+        # Perguntar o modo de divisão
+        modo, ok = QInputDialog.getItem(
             parent_window,
             "Dividir CSV",
-            f"O arquivo tem {total_linhas} linhas.\nEm quantas linhas por arquivo deseja dividir?",
-            value=1000,
-            minValue=1,
-            maxValue=total_linhas
+            "Como deseja dividir o arquivo?",
+            MODOS_DIVISAO,
+            0,
+            False
         )
         
         if not ok:
             return
         
-        # Calcular número de arquivos necessários
-        num_arquivos = (total_linhas + linhas_por_arquivo - 1) // linhas_por_arquivo
+        pasta_destino = "CSV"
+        tamanho_mb = os.path.getsize(file_path) / (1024 * 1024)
+        
+        if modo == MODO_POR_LINHAS:
+            # Estimar pelo início do arquivo: contar tudo travaria a interface em arquivos grandes
+            estimativa = estimar_registros_csv(file_path)
+            
+            # Perguntar o número de linhas por arquivo
+            linhas_por_arquivo, ok = QInputDialog.getInt(
+                parent_window,
+                "Dividir CSV",
+                f"O arquivo tem cerca de {estimativa} linhas.\nEm quantas linhas por arquivo deseja dividir?",
+                value=1000,
+                minValue=1,
+                maxValue=2**31 - 1  # A estimativa pode ficar abaixo do total real
+            )
+            
+            if not ok:
+                return
+            
+            # Calcular número de arquivos necessários
+            num_arquivos = max(1, math.ceil(estimativa / linhas_por_arquivo))
+            descricao = (f"O arquivo será dividido em aproximadamente {num_arquivos} arquivos "
+                         f"com {linhas_por_arquivo} linhas cada.")
+            detalhe = f"Linhas por arquivo: {linhas_por_arquivo}"
+            dividir = lambda progresso, parar: dividir_csv_em_partes(
+                file_path, linhas_por_arquivo, pasta_destino, progresso, parar
+            )
+        
+        elif modo == MODO_POR_TAMANHO:
+            # Perguntar o tamanho máximo de cada arquivo
+            max_mb, ok = QInputDialog.getDouble(
+                parent_window,
+                "Dividir CSV",
+                f"O arquivo tem {tamanho_mb:.1f} MB.\nQual o tamanho máximo de cada arquivo (MB)?",
+                value=10.0,
+                minValue=0.01,
+                maxValue=100000.0,
+                decimals=2
+            )
+            
+            if not ok:
+                return
+            
+            num_arquivos = max(1, math.ceil(tamanho_mb / max_mb))
+            descricao = f"O arquivo será dividido em aproximadamente {num_arquivos} arquivos de até {max_mb:g} MB."
+            detalhe = f"Tamanho máximo por arquivo: {max_mb:g} MB"
+            dividir = lambda progresso, parar: dividir_csv_por_tamanho(
+                file_path, int(max_mb * 1024 * 1024), pasta_destino, progresso, parar
+            )
+        
+        else:
+            # Perguntar a coluna que define cada arquivo
+            colunas = ler_colunas(file_path)
+            if not colunas:
+                QMessageBox.critical(parent_window, "Erro", "O arquivo não tem cabeçalho.")
+                return
+            
+            coluna, ok = QInputDialog.getItem(
+                parent_window,
+                "Dividir CSV",
+                "Gerar um arquivo para cada valor da coluna:",
+                colunas,
+                colunas.index("id da categoria pai") if "id da categoria pai" in colunas else 0,
+                False
+            )
+            
+            if not ok:
+                return
+            
+            descricao = f"Será criado um arquivo para cada valor da coluna '{coluna}'."
+            detalhe = f"Coluna: {coluna}"
+            dividir = lambda progresso, parar: dividir_csv_por_coluna(
+                file_path, coluna, pasta_destino, progresso, parar
+            )
         
         # Confirmar operação
         reply = QMessageBox.question(
             parent_window,
             "Confirmar Divisão",
-            f"O arquivo será dividido em {num_arquivos} arquivos com {linhas_por_arquivo} linhas cada.\nContinuar?"
+            f"{descricao}\nContinuar?"
         )
         
         if reply != QMessageBox.Yes:
             return
         
-        # Obter nome base do arquivo original
-        nome_base = os.path.splitext(os.path.basename(file_path))[0]
-        pasta_destino = "CSV"
-        
-        # Dividir o DataFrame
-        arquivos_criados = []
-        for i in range(num_arquivos):
-            inicio = i * linhas_por_arquivo
-            fim = min((i + 1) * linhas_por_arquivo, total_linhas)
+        def tarefa(callback_progresso, deve_parar):
+            # Progresso pelos bytes processados (em KB, para caber no int do sinal):
+            # o total é o tamanho do arquivo, sem uma passada extra só para contar
+            total_kb = max(1, os.path.getsize(file_path) // 1024)
             
-            # Extrair parte do DataFrame
-            parte_df = df.iloc[inicio:fim]
+            # Dividir o arquivo em streaming, gravando cada parte conforme é lida
+            arquivos_criados = dividir(
+                lambda registros, processados: callback_progresso(
+                    min(processados // 1024, total_kb), total_kb,
+                    f"{registros} linhas gravadas ({processados / (1024 * 1024):.1f} de {tamanho_mb:.1f} MB)"
+                ),
+                deve_parar
+            )
+            num_arquivos = len(arquivos_criados)
             
-            # Nome do arquivo
-            nome_arquivo = f"{nome_base}_parte_{i+1:03d}.csv"
-            caminho_completo = os.path.join(pasta_destino, nome_arquivo)
+            if deve_parar():
+                return (f"Divisão cancelada.\n"
+                        f"Arquivos criados até o cancelamento: {num_arquivos}")
             
-            # Salvar arquivo
-            parte_df.to_csv(caminho_completo, index=False, encoding='utf-8')
-            arquivos_criados.append(nome_arquivo)
+            return (
+                f"Arquivo dividido com sucesso!\n"
+                f"Total de arquivos criados: {num_arquivos}\n"
+                f"{detalhe}\n"
+                f"Arquivos salvos na pasta: {pasta_destino}/\n\n"
+                f"Primeiros arquivos:\n" + "\n".join(arquivos_criados[:5]) + 
+                (f"\n... e mais {len(arquivos_criados) - 5} arquivos" if len(arquivos_criados) > 5 else "")
+            )
+        
+        return tarefa
+        
+    except Exception as e:
+        QMessageBox.critical(parent_window, "Erro", f"Erro ao dividir CSV: {str(e)}")
+
+def juntar_csv(parent_window):
+    """
+    Função para juntar vários arquivos CSV em um só, alinhando as colunas pelo nome
+    
+    Coleta as opções na interface e retorna a tarefa para o CsvWorker (ou None se cancelado).
+    """
+    try:
+        # Abrir diálogo para selecionar os arquivos
+        arquivos, _ = QFileDialog.getOpenFileNames(
+            parent_window,
+            "Selecione os arquivos CSV para juntar",
+            "CSV",
+            "CSV Files (*.csv);;All Files (*)"
+        )
+        
+        if not arquivos:
+            return
+        
+        if len(arquivos) < 2:
+            QMessageBox.warning(parent_window, "Aviso", "Selecione pelo menos dois arquivos.")
+            return
         
-        # Mostrar resultado
-        QMessageBox.information(
+        # Perguntar a coluna usada para remover duplicatas
+        colunas = ler_cabecalhos(arquivos)
+        opcoes = [SEM_DEDUPLICACAO] + colunas
+        coluna, ok = QInputDialog.getItem(
             parent_window,
-            "Divisão Concluída",
-            f"Arquivo dividido com sucesso!\n"
-            f"Total de arquivos criados: {num_arquivos}\n"
-            f"Linhas por arquivo: {linhas_por_arquivo}\n"
-            f"Arquivos salvos na pasta: {pasta_destino}/\n\n"
-            f"Primeiros arquivos:\n" + "\n".join(arquivos_criados[:5]) + 
-            (f"\n... e mais {len(arquivos_criados) - 5} arquivos" if len(arquivos_criados) > 5 else "")
+            "Juntar CSVs",
+            f"{len(arquivos)} arquivos, {len(colunas)} colunas no total.\n"
+            "Remover linhas repetidas pela coluna:",
+            opcoes,
+            opcoes.index("product_id") if "product_id" in opcoes else 0,
+            False
         )
         
+        if not ok:
+            return
+        
+        coluna_chave = None if coluna == SEM_DEDUPLICACAO else coluna
+        pasta_destino = "CSV"
+        novo_path = os.path.join(pasta_destino, f"juntado_{int(time.time())}.csv")
+        
+        def tarefa(callback_progresso, deve_parar):
+            total = sum(contar_registros_csv(arquivo) for arquivo in arquivos)
+            resultado = juntar_csvs(
+                arquivos,
+                novo_path,
+                coluna_chave,
+                lambda linhas: callback_progresso(linhas, total, f"{linhas} de {total} linhas lidas"),
+                deve_parar
+            )
+            
+            if deve_parar():
+                return (f"Junção cancelada.\n"
+                        f"O arquivo {novo_path} ficou incompleto.")
+            
+            return (
+                f"Arquivos juntados com sucesso!\n\n"
+                f"Arquivo salvo como: {novo_path}\n\n"
+                f"Estatísticas:\n"
+                f"- Arquivos: {resultado.arquivos}\n"
+                f"- Colunas: {resultado.colunas}\n"
+                f"- Linhas lidas: {resultado.linhas_lidas}\n"
+                f"- Linhas gravadas: {resultado.linhas_gravadas}\n"
+                + (f"- Duplicadas removidas ({coluna_chave}): {resultado.duplicadas}" if coluna_chave else "")
+            )
+        
+        return tarefa
+        
     except Exception as e:
-        QMessageBox.critical(parent_window, "Erro", f"Erro ao dividir CSV: {str(e)}")
+        QMessageBox.critical(parent_window, "Erro", f"Erro ao juntar CSVs: {str(e)}")
 
 def formatar_csv(parent_window):
-    """Função para formatar CSV e enviar para Google Sheets"""
+    """Função para formatar CSV e enviar para Google Sheets (retorna a tarefa para o CsvWorker)"""
     try:
         # Abrir diálogo para selecionar arquivo
         file_path, _ = QFileDialog.getOpenFileName(
@@ -109,82 +294,50 @@ def formatar_csv(parent_window):
             return
         elif reply == QMessageBox.Yes:
             # Salvar no Google Sheets
-            salvar_no_google_sheets(file_path, parent_window)
+            return salvar_no_google_sheets(file_path, parent_window)
         else:
             # Salvar localmente (função original)
-            salvar_localmente(file_path, parent_window)
+            return salvar_localmente(file_path, parent_window)
         
     except Exception as e:
         QMessageBox.critical(parent_window, "Erro", f"Erro ao formatar CSV: {str(e)}")
 
 def salvar_localmente(file_path, parent_window):
-    """Salva o arquivo formatado localmente"""
-    try:
-        # Definir colunas para manter
-        COLUNAS_PARA_MANTER = [
-            "navigation_id", 
-            "titulo", 
-            "descrição", 
-            "ativo", 
-            "tipo de produto", 
-            "id da categoria pai", 
-            "id da subcategoria", 
-            "link do produto"
-        ]
-        
-        # Ler o arquivo CSV
-        df_completo = pd.read_csv(file_path)
-        
-        # Verificar se as colunas necessárias existem no arquivo
-        colunas_existentes = df_completo.columns.tolist()
-        colunas_faltantes = [coluna for coluna in COLUNAS_PARA_MANTER if coluna not in colunas_existentes]
-        
-        if colunas_faltantes:
-            QMessageBox.critical(
-                parent_window,
-                "Erro", 
-                f"Colunas não encontradas no arquivo:\n{', '.join(colunas_faltantes)}\n\n"
-                f"Colunas disponíveis:\n{', '.join(colunas_existentes)}"
-            )
-            return
-        
-        # Manter apenas as colunas especificadas
-        df_filtrado = df_completo[COLUNAS_PARA_MANTER].copy()
-        
-        # Criar nova coluna 'link_backoffice'
-        link_base = 'https://enrichment-backoffice.magalu.com/product-enrichment/'
-        df_filtrado['link_backoffice'] = [f'{link_base}{n}/edit' for n in df_filtrado['navigation_id']]
-        
-        # Preencher valores NaN com string vazia
-        df_filtrado = df_filtrado.fillna("")
-        
-        # Salvar arquivo formatado
+    """Retorna a tarefa que salva o arquivo formatado localmente"""
+    def tarefa(callback_progresso, deve_parar):
+        # Formatar e salvar em blocos, sem carregar o arquivo inteiro na memória
+        total = contar_registros_csv(file_path)
+        callback_progresso(0, total, "Formatando...")
         nome_base = os.path.splitext(os.path.basename(file_path))[0]
         novo_path = f"CSV/{nome_base}_formatado.csv"
-        df_filtrado.to_csv(novo_path, index=False, encoding='utf-8')
+        total_linhas = formatar_arquivo(
+            file_path,
+            novo_path,
+            callback_progresso=lambda linhas: callback_progresso(linhas, total, f"{linhas} de {total} linhas formatadas"),
+            deve_parar=deve_parar
+        )
         
-        # Mostrar estatísticas
-        QMessageBox.information(
-            parent_window,
-            "Formatação Concluída", 
+        if deve_parar():
+            return "Formatação cancelada."
+        
+        # Estatísticas
+        return (
             f"Arquivo formatado salvo como: {novo_path}\n\n"
             f"Estatísticas:\n"
             f"- Colunas mantidas: {len(COLUNAS_PARA_MANTER)}\n"
             f"- Coluna adicionada: link_backoffice\n"
-            f"- Total de linhas: {len(df_filtrado)}\n"
-            f"- Total de colunas: {len(df_filtrado.columns)}"
+            f"- Total de linhas: {total_linhas}\n"
+            f"- Total de colunas: {len(COLUNAS_PARA_MANTER) + 1}"
         )
-        
-    except Exception as e:
-        QMessageBox.critical(parent_window, "Erro", f"Erro ao salvar localmente: {str(e)}")
+    
+    return tarefa
 
 def salvar_no_google_sheets(file_path, parent_window):
-    """Salva o arquivo formatado no Google Sheets"""
+    """Coleta os dados da planilha e retorna a tarefa que envia o arquivo formatado ao Google Sheets"""
     try:
-        # Importações necessárias para Google Sheets
+        # Verificar se as bibliotecas do Google Sheets estão instaladas
         try:
             import gspread
-            from google.oauth2.service_account import Credentials
         except ImportError:
             QMessageBox.critical(
                 parent_window,
@@ -194,24 +347,6 @@ def salvar_no_google_sheets(file_path, parent_window):
             )
             return
         
-        # Definir escopos
-        SCOPES = [
-            'https://www.googleapis.com/auth/spreadsheets',
-            'https://www.googleapis.com/auth/drive'
-        ]
-        
-        # Definir colunas para manter
-        COLUNAS_PARA_MANTER = [
-            "navigation_id", 
-            "titulo", 
-            "descrição", 
-            "ativo", 
-            "tipo de produto", 
-            "id da categoria pai", 
-            "id da subcategoria", 
-            "link do produto"
-        ]
-        
         # Pedir nome da planilha e aba
         nome_planilha, ok = QInputDialog.getText(
             parent_window,
@@ -233,8 +368,22 @@ def salvar_no_google_sheets(file_path, parent_window):
         if not ok:
             return
         
+        # Perguntar se deve enviar só as diferenças em relação à aba atual
+        resposta = QMessageBox.question(
+            parent_window,
+            "Google Sheets - Modo de Envio",
+            "Enviar apenas as linhas novas, alteradas e removidas?\n\n"
+            f"Sim: Atualizar por diferenças (compara pela coluna {COLUNA_CHAVE})\n"
+            "Não: Limpar a aba e reenviar tudo",
+            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel
+        )
+        
+        if resposta == QMessageBox.Cancel:
+            return
+        por_diferencas = resposta == QMessageBox.Yes
+        
         # Verificar se o arquivo de credenciais existe
-        if not os.path.exists('credentials.json'):
+        if not os.path.exists(ARQUIVO_CREDENCIAIS):
             QMessageBox.critical(
                 parent_window,
                 "Arquivo de Credenciais",
@@ -247,118 +396,103 @@ def salvar_no_google_sheets(file_path, parent_window):
             )
             return
         
-        # Carregar credenciais
-        try:
-            creds = Credentials.from_service_account_file('credentials.json', scopes=SCOPES)
-            client = gspread.authorize(creds)
-        except Exception as e:
-            QMessageBox.critical(
-                parent_window,
-                "Erro de Autenticação",
-                f"Erro ao autenticar com Google Sheets:\n{str(e)}"
-            )
-            return
-        
-        # Abrir planilha
-        try:
-            spreadsheet = client.open(nome_planilha)
-        except gspread.SpreadsheetNotFound:
-            QMessageBox.critical(
-                parent_window,
-                "Planilha Não Encontrada",
-                f"Planilha '{nome_planilha}' não encontrada.\n\n"
-                "Verifique:\n"
-                "1. O nome está exato\n"
-                "2. A planilha foi compartilhada com o e-mail da service account"
-            )
-            return
-        
-        # Selecionar aba
-        try:
-            if nome_aba:
-                sheet = spreadsheet.worksheet(nome_aba)
-            else:
-                sheet = spreadsheet.sheet1
-        except gspread.WorksheetNotFound:
-            QMessageBox.critical(
-                parent_window,
-                "Aba Não Encontrada",
-                f"Aba '{nome_aba}' não encontrada na planilha."
-            )
-            return
-        
-        # Ler e processar o CSV
-        try:
-            df_completo = pd.read_csv(file_path)
-            
-            # Verificar se as colunas necessárias existem
-            colunas_existentes = df_completo.columns.tolist()
-            colunas_faltantes = [coluna for coluna in COLUNAS_PARA_MANTER if coluna not in colunas_existentes]
+        def tarefa(callback_progresso, deve_parar):
+            # Carregar credenciais (o cliente autenticado é reaproveitado entre envios)
+            callback_progresso(0, 4, "Autenticando no Google Sheets...")
+            try:
+                client = obter_cliente()
+            except Exception as e:
+                raise Exception(f"Erro ao autenticar com Google Sheets:\n{str(e)}")
             
-            if colunas_faltantes:
-                QMessageBox.critical(
-                    parent_window,
-                    "Erro", 
-                    f"Colunas não encontradas no arquivo:\n{', '.join(colunas_faltantes)}\n\n"
-                    f"Colunas disponíveis:\n{', '.join(colunas_existentes)}"
+            # Abrir planilha (pelo ID em cache, quando houver)
+            try:
+                spreadsheet = abrir_planilha(client, nome_planilha)
+            except gspread.SpreadsheetNotFound:
+                raise Exception(
+                    f"Planilha '{nome_planilha}' não encontrada.\n\n"
+                    "Verifique:\n"
+                    "1. O nome está exato\n"
+                    "2. A planilha foi compartilhada com o e-mail da service account"
                 )
-                return
             
-            # Manter apenas as colunas especificadas
-            df_filtrado = df_completo[COLUNAS_PARA_MANTER].copy()
+            # Selecionar aba
+            try:
+                if nome_aba:
+                    sheet = spreadsheet.worksheet(nome_aba)
+                else:
+                    sheet = spreadsheet.sheet1
+            except gspread.WorksheetNotFound:
+                raise Exception(f"Aba '{nome_aba}' não encontrada na planilha.")
             
-            # Criar nova coluna 'link_backoffice'
-            link_base = 'https://enrichment-backoffice.magalu.com/product-enrichment/'
-            df_filtrado['link_backoffice'] = [f'{link_base}{n}/edit' for n in df_filtrado['navigation_id']]
+            if deve_parar():
+                return "Envio cancelado."
             
-            # Preencher valores NaN com string vazia
-            df_filtrado = df_filtrado.fillna("")
+            # Ler e processar o CSV
+            callback_progresso(1, 4, "Lendo e formatando o CSV...")
+            try:
+                if por_diferencas:
+                    # A comparação precisa de todas as linhas (só as colunas mantidas)
+                    df_filtrado = formatar_dataframe(ler_colunas_formatacao(file_path))
+                    total = len(df_filtrado)
+                else:
+                    # A reescrita lê e envia o CSV em blocos, com memória limitada
+                    validar_colunas(file_path)
+                    total = contar_registros_csv(file_path)
+            except Exception as e:
+                raise Exception(f"Erro ao processar o arquivo CSV:\n{str(e)}")
             
-        except Exception as e:
-            QMessageBox.critical(
-                parent_window,
-                "Erro ao Processar CSV",
-                f"Erro ao processar o arquivo CSV:\n{str(e)}"
-            )
-            return
-        
-        # Enviar para Google Sheets
-        try:
-            # Preparar dados para envio
-            dados_para_enviar = [df_filtrado.columns.values.tolist()] + df_filtrado.values.tolist()
+            if deve_parar():
+                return "Envio cancelado."
             
-            # Calcular range dinamicamente
-            num_colunas = len(df_filtrado.columns)
-            num_linhas = len(dados_para_enviar)
-            col_final = chr(64 + num_colunas)  # Converte número para letra (A, B, C...)
+            # Enviar para Google Sheets
+            callback_progresso(0, total, "Enviando dados...")
+            delta = None
+            try:
+                if por_diferencas:
+                    delta = sincronizar_aba(
+                        sheet,
+                        df_filtrado,
+                        callback_progresso=lambda linhas: callback_progresso(0, 0, f"{linhas} linhas atualizadas"),
+                        deve_parar=deve_parar
+                    )
+                    enviadas = total
+                else:
+                    enviadas = reescrever_aba(
+                        sheet,
+                        COLUNAS_PARA_MANTER + ['link_backoffice'],
+                        (bloco.values.tolist() for bloco in iterar_blocos_formatados(file_path)),
+                        callback_progresso=lambda linhas: callback_progresso(linhas, total, f"{linhas} de {total} linhas enviadas"),
+                        deve_parar=deve_parar
+                    )
+            except Exception as e:
+                raise Exception(f"Erro ao enviar dados para o Google Sheets:\n{str(e)}")
             
-            # Limpar planilha existente (opcional)
-            sheet.clear()
+            if deve_parar():
+                return f"Envio cancelado.\nA aba '{sheet.title}' pode ter ficado incompleta."
             
-            # Enviar dados
-            sheet.update(
-                values=dados_para_enviar,
-                range_name=f'A1:{col_final}{num_linhas}'
-            )
+            if delta is not None:
+                resumo = (
+                    f"Linhas inseridas: {len(delta.inseridas)}\n"
+                    f"Linhas alteradas: {len(delta.alteradas)}\n"
+                    f"Linhas removidas: {len(delta.removidas)}\n"
+                    f"Linhas inalteradas: {delta.inalteradas}\n"
+                )
+            elif por_diferencas:
+                resumo = f"Aba vazia ou com outro cabeçalho: reescrita completa\nLinhas enviadas: {enviadas}\n"
+            else:
+                resumo = f"Linhas enviadas: {enviadas}\n"
             
-            # Mostrar resultado
-            QMessageBox.information(
-                parent_window,
-                "Upload Concluído",
+            # Resultado
+            return (
                 f"Dados enviados com sucesso para o Google Sheets!\n\n"
                 f"Planilha: {nome_planilha}\n"
                 f"Aba: {sheet.title}\n"
-                f"Linhas enviadas: {len(df_filtrado)}\n"
-                f"Colunas: {len(df_filtrado.columns)}\n\n"
+                f"{resumo}"
+                f"Colunas: {len(COLUNAS_PARA_MANTER) + 1}\n\n"
                 f"URL: https://docs.google.com/spreadsheets/d/{spreadsheet.id}"
             )
-            
-        except Exception as e:
-            QMessageBox.critical(
-                parent_window,
-                "Erro no Upload",
-                f"Erro ao enviar dados para o Google Sheets:\n{str(e)}"
-            )
+        
+        return tarefa
         
     except Exception as e:
         QMessageBox.critical(parent_window, "Erro", f"Erro ao salvar no Google Sheets: {str(e)}")
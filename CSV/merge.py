@@ -0,0 +1,152 @@
+import os
+import csv
+import sqlite3
+import tempfile
+from dataclasses import dataclass
+
+# Chaves mantidas em memória antes de descarregar no índice em disco
+MAX_CHAVES_MEMORIA = 1_000_000
+
+class ConjuntoChaves:
+    """
+    Conjunto de chaves já vistas com memória limitada.
+
+    Até `max_memoria` chaves ficam num set; ao encher, elas são descarregadas
+    num índice SQLite temporário (chave primária) e o set recomeça vazio.
+    A consulta olha primeiro a memória e só depois o disco.
+    """
+
+    def __init__(self, max_memoria=MAX_CHAVES_MEMORIA, pasta_temporaria=None):
+        self.max_memoria = max_memoria
+        self.pasta_temporaria = pasta_temporaria
+        self.memoria = set()
+        self.descarregadas = 0
+        self._db = None
+        self._caminho_db = None
+
+    def adicionar(self, chave):
+        """Adiciona a chave; retorna False se ela já tinha sido vista"""
+        if chave in self.memoria:
+            return False
+        if self._db is not None and self._db.execute(
+            "SELECT 1 FROM chaves WHERE chave = ?", (chave,)
+        ).fetchone():
+            return False
+
+        self.memoria.add(chave)
+        if len(self.memoria) >= self.max_memoria:
+            self._descarregar()
+        return True
+
+    def _descarregar(self):
+        if self._db is None:
+            descritor, self._caminho_db = tempfile.mkstemp(suffix=".sqlite3", dir=self.pasta_temporaria)
+            os.close(descritor)
+            self._db = sqlite3.connect(self._caminho_db)
+            self._db.execute("PRAGMA journal_mode = OFF")
+            self._db.execute("PRAGMA synchronous = OFF")
+            self._db.execute("CREATE TABLE chaves (chave TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._db.executemany("INSERT OR IGNORE INTO chaves VALUES (?)", ((chave,) for chave in self.memoria))
+        self._db.commit()
+        self.descarregadas += len(self.memoria)
+        self.memoria = set()
+
+    def fechar(self):
+        """Fecha e apaga o índice em disco, se tiver sido criado"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+            os.remove(self._caminho_db)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+@dataclass
+class ResultadoJuncao:
+    """Resumo da junção de CSVs"""
+    arquivos: int = 0
+    linhas_lidas: int = 0
+    linhas_gravadas: int = 0
+    duplicadas: int = 0
+    colunas: int = 0
+    chaves_em_disco: int = 0
+
+def ler_cabecalhos(arquivos, encoding='utf-8-sig'):
+    """Retorna a união das colunas dos arquivos, na ordem em que aparecem"""
+    colunas = []
+    for caminho in arquivos:
+        with open(caminho, 'r', encoding=encoding, newline='') as arquivo:
+            for coluna in next(csv.reader(arquivo), []):
+                if coluna not in colunas:
+                    colunas.append(coluna)
+    return colunas
+
+def juntar_csvs(arquivos, destino, coluna_chave=None, callback_progresso=None, deve_parar=None,
+                max_chaves_memoria=MAX_CHAVES_MEMORIA, encoding='utf-8-sig'):
+    """
+    Junta vários CSVs em `destino`, lendo e gravando uma linha por vez.
+
+    As colunas são alinhadas pelo nome: a saída tem a união das colunas e
+    quem não tem uma coluna fica com o campo vazio. Com `coluna_chave`
+    (ex.: "product_id"), só a primeira linha de cada chave é mantida; linhas
+    com a chave vazia são mantidas sempre. As chaves vistas ficam num
+    ConjuntoChaves, então a memória não cresce com o tamanho das entradas.
+    `callback_progresso(linhas_lidas)` é chamado a cada 10.000 linhas.
+    """
+    colunas = ler_cabecalhos(arquivos, encoding)
+    if coluna_chave and coluna_chave not in colunas:
+        raise ValueError(f"Coluna '{coluna_chave}' não encontrada em nenhum dos arquivos")
+
+    resultado = ResultadoJuncao(colunas=len(colunas))
+    pasta_destino = os.path.dirname(os.path.abspath(destino))
+    os.makedirs(pasta_destino, exist_ok=True)
+
+    with ConjuntoChaves(max_chaves_memoria, pasta_destino) as chaves, \
+            open(destino, 'w', encoding='utf-8', newline='') as saida:
+        writer = csv.writer(saida)
+        writer.writerow(colunas)
+
+        for caminho in arquivos:
+            if deve_parar and deve_parar():
+                break
+
+            with open(caminho, 'r', encoding=encoding, newline='') as arquivo:
+                reader = csv.reader(arquivo)
+                cabecalho = next(reader, None)
+                if cabecalho is None:
+                    continue
+                resultado.arquivos += 1
+
+                # Posição de cada coluna da saída neste arquivo (None se não existir)
+                posicoes = [cabecalho.index(coluna) if coluna in cabecalho else None for coluna in colunas]
+                indice_chave = cabecalho.index(coluna_chave) if coluna_chave in cabecalho else None
+
+                for campos in reader:
+                    if not campos:
+                        continue  # Linhas em branco
+                    resultado.linhas_lidas += 1
+
+                    if coluna_chave:
+                        chave = campos[indice_chave] if indice_chave is not None and indice_chave < len(campos) else ""
+                        if chave and not chaves.adicionar(chave):
+                            resultado.duplicadas += 1
+                            continue
+
+                    writer.writerow([
+                        campos[posicao] if posicao is not None and posicao < len(campos) else ""
+                        for posicao in posicoes
+                    ])
+                    resultado.linhas_gravadas += 1
+
+                    if resultado.linhas_lidas % 10000 == 0:
+                        if callback_progresso:
+                            callback_progresso(resultado.linhas_lidas)
+                        if deve_parar and deve_parar():
+                            break
+
+        resultado.chaves_em_disco = chaves.descarregadas
+
+    return resultado
@@ -1,14 +1,15 @@
-from PySide6.QtWidgets import (QWidget, QVBoxLayout, QPushButton, QLabel)
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QPushButton, QLabel, QProgressBar, QMessageBox)
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
-from CSV.functions import dividir_csv, formatar_csv
+from CSV.functions import CsvWorker, dividir_csv, formatar_csv, juntar_csv
 
 class CsvToolsWindow(QWidget):
     def __init__(self, main_window):
         super().__init__()
         self.main_window = main_window
         self.setWindowTitle("Ferramentas para manipular CSV")
-        self.setFixedSize(400, 400)
+        self.setFixedSize(400, 515)
+        self.worker = None
 
         # Layout principal
         layout = QVBoxLayout(self)
@@ -25,16 +26,37 @@ class CsvToolsWindow(QWidget):
         layout.addWidget(title_label)
 
         # Botão Dividir CSV
-        dividir_button = QPushButton("Dividir CSV")
-        dividir_button.setFixedHeight(40)
-        dividir_button.clicked.connect(self.dividir_csv_action)
-        layout.addWidget(dividir_button)
+        self.dividir_button = QPushButton("Dividir CSV")
+        self.dividir_button.setFixedHeight(40)
+        self.dividir_button.clicked.connect(self.dividir_csv_action)
+        layout.addWidget(self.dividir_button)
 
         # Botão Formatar CSV
-        formatar_button = QPushButton("Formatar CSV")
-        formatar_button.setFixedHeight(40)
-        formatar_button.clicked.connect(self.formatar_csv_action)
-        layout.addWidget(formatar_button)
+        self.formatar_button = QPushButton("Formatar CSV")
+        self.formatar_button.setFixedHeight(40)
+        self.formatar_button.clicked.connect(self.formatar_csv_action)
+        layout.addWidget(self.formatar_button)
+
+        # Botão Juntar CSVs
+        self.juntar_button = QPushButton("Juntar CSVs")
+        self.juntar_button.setFixedHeight(40)
+        self.juntar_button.clicked.connect(self.juntar_csv_action)
+        layout.addWidget(self.juntar_button)
+
+        # Progresso da operação em andamento
+        self.status_label = QLabel("")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.status_label.setStyleSheet("color: gray;")
+        layout.addWidget(self.status_label)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        layout.addWidget(self.progress_bar)
+
+        self.cancel_button = QPushButton("⏹️ Cancelar")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancelar_tarefa)
+        layout.addWidget(self.cancel_button)
 
         # Espaçamento
         layout.addStretch()
@@ -47,13 +69,87 @@ class CsvToolsWindow(QWidget):
 
     def dividir_csv_action(self):
         """Ação para o botão Dividir CSV"""
-        dividir_csv(self)
+        tarefa = dividir_csv(self)
+        if tarefa:
+            self.executar_tarefa(tarefa, "Dividindo CSV...")
 
     def formatar_csv_action(self):
         """Ação para o botão Formatar CSV"""
-        formatar_csv(self)
+        tarefa = formatar_csv(self)
+        if tarefa:
+            self.executar_tarefa(tarefa, "Formatando CSV...")
+
+    def juntar_csv_action(self):
+        """Ação para o botão Juntar CSVs"""
+        tarefa = juntar_csv(self)
+        if tarefa:
+            self.executar_tarefa(tarefa, "Juntando CSVs...")
+
+    def executar_tarefa(self, tarefa, descricao):
+        """Executa a tarefa em um CsvWorker, sem travar a janela"""
+        self.dividir_button.setEnabled(False)
+        self.formatar_button.setEnabled(False)
+        self.juntar_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.progress_bar.setMaximum(0)  # Indeterminado até o primeiro progresso
+        self.status_label.setText(descricao)
+
+        self.worker = CsvWorker(tarefa)
+        self.worker.progress_signal.connect(self.atualizar_progresso)
+        self.worker.finished_signal.connect(self.tarefa_concluida)
+        self.worker.error_signal.connect(self.tarefa_erro)
+        self.worker.start()
+
+    def atualizar_progresso(self, atual, total, mensagem):
+        """Atualiza barra de progresso e status"""
+        if total > 0:
+            self.progress_bar.setMaximum(total)
+            self.progress_bar.setValue(min(atual, total))
+
+        if mensagem:
+            self.status_label.setText(mensagem)
+
+    def tarefa_concluida(self, mensagem):
+        """Processa conclusão da operação"""
+        self.restaurar_controles()
+        QMessageBox.information(self, "Concluído", mensagem)
+
+    def tarefa_erro(self, mensagem):
+        """Processa erro na operação"""
+        self.restaurar_controles()
+        QMessageBox.critical(self, "Erro", mensagem)
+
+    def cancelar_tarefa(self):
+        """Pede o cancelamento; o worker termina no próximo ponto seguro"""
+        if self.worker and self.worker.isRunning():
+            self.worker.stop()
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText("Cancelando...")
+
+    def restaurar_controles(self):
+        """Restaura controles para estado inicial"""
+        self.dividir_button.setEnabled(True)
+        self.formatar_button.setEnabled(True)
+        self.juntar_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.progress_bar.setMaximum(100)
+        self.progress_bar.setValue(0)
+        self.status_label.setText("")
+        # A referência ao worker é mantida: o sinal final é emitido antes de a thread terminar
+
+    def parar_worker(self):
+        """Cancela e espera a operação em andamento, se houver"""
+        if self.worker and self.worker.isRunning():
+            self.worker.stop()
+            self.worker.wait()
+
+    def closeEvent(self, event):
+        """Trata o fechamento da janela"""
+        self.parar_worker()
+        event.accept()
 
     def voltar(self):
         """Volta para a janela principal"""
+        self.parar_worker()
         self.main_window.show()
         self.close()
@@ -0,0 +1,417 @@
+import os
+import json
+import time
+import random
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List
+
+import requests
+
+# Coluna que identifica cada linha na sincronização por diferenças
+COLUNA_CHAVE = "navigation_id"
+
+# Limites de cada requisição: a API recomenda payloads de até ~2 MB
+LINHAS_POR_LOTE = 5000
+BYTES_POR_LOTE = 2 * 1024 * 1024
+# Cota de escrita da API: 60 requisições por minuto por usuário
+INTERVALO_MINIMO = 1.0
+TENTATIVAS = 5
+ESPERA_MAXIMA = 64.0
+STATUS_TEMPORARIOS = (429, 500, 502, 503, 504)
+# Chamadas que não podem ser repetidas às cegas: após um 5xx ou queda de conexão
+# a operação pode já ter sido aplicada (linhas duplicadas ou removidas a mais)
+METODOS_NAO_IDEMPOTENTES = ('append_rows', 'delete_rows')
+
+ARQUIVO_CREDENCIAIS = 'credentials.json'
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+# Cache nome da planilha -> ID, para abrir por ID sem a busca por título no Drive
+CACHE_IDS_PLANILHAS = Path(".cache") / "sheets" / "ids_planilhas.json"
+TTL_ID_PLANILHA = 24 * 60 * 60  # 24 horas
+
+def letra_coluna(numero):
+    """Converte o número da coluna (1 = A) na letra usada em ranges A1 (27 = AA)"""
+    letras = ""
+    while numero > 0:
+        numero, resto = divmod(numero - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+# Estado compartilhado pelo processo: cliente autenticado, IDs e planilhas já abertas
+_lock_cliente = threading.Lock()
+_cliente = None
+_chave_cliente = None
+_ids_planilhas = None
+_planilhas = {}
+
+def obter_cliente(arquivo_credenciais=ARQUIVO_CREDENCIAIS):
+    """
+    Retorna o cliente gspread do processo, autenticando só na primeira chamada.
+
+    O token da service account é renovado automaticamente pela sessão do
+    google-auth quando expira. O cliente é recriado se o arquivo de
+    credenciais mudar.
+    """
+    global _cliente, _chave_cliente
+    import gspread
+    from google.oauth2.service_account import Credentials
+
+    chave = (os.path.abspath(arquivo_credenciais), os.path.getmtime(arquivo_credenciais))
+    with _lock_cliente:
+        if _cliente is None or _chave_cliente != chave:
+            creds = Credentials.from_service_account_file(arquivo_credenciais, scopes=SCOPES)
+            _cliente = gspread.authorize(creds)
+            _chave_cliente = chave
+            _planilhas.clear()
+        return _cliente
+
+def _carregar_ids():
+    global _ids_planilhas
+    if _ids_planilhas is None:
+        try:
+            _ids_planilhas = json.loads(CACHE_IDS_PLANILHAS.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            _ids_planilhas = {}
+    return _ids_planilhas
+
+def _salvar_ids():
+    try:
+        CACHE_IDS_PLANILHAS.parent.mkdir(parents=True, exist_ok=True)
+        CACHE_IDS_PLANILHAS.write_text(json.dumps(_ids_planilhas), encoding='utf-8')
+    except OSError:
+        pass  # O cache é só uma otimização
+
+def abrir_planilha(client, nome_planilha, ttl=TTL_ID_PLANILHA):
+    """
+    Abre a planilha pelo nome usando o cache nome -> ID (com TTL, salvo em disco).
+
+    Com o ID em cache a planilha é aberta com `open_by_key`, sem a busca por
+    título no Drive; a planilha aberta também fica guardada para as próximas
+    chamadas. Se o ID salvo não abrir mais, o cache é descartado e a busca por
+    título é feita de novo. Levanta gspread.SpreadsheetNotFound se não existir.
+    """
+    import gspread
+
+    with _lock_cliente:
+        ids = _carregar_ids()
+        entrada = ids.get(nome_planilha)
+        planilha_id = entrada['id'] if entrada and time.time() - entrada['salvo_em'] < ttl else None
+        if planilha_id and planilha_id in _planilhas:
+            return _planilhas[planilha_id]
+
+    spreadsheet = None
+    if planilha_id:
+        try:
+            spreadsheet = client.open_by_key(planilha_id)
+        except (gspread.SpreadsheetNotFound, gspread.exceptions.APIError):
+            spreadsheet = None
+        # Outra planilha pode ter recebido o nome: confere o título
+        if spreadsheet is not None and spreadsheet.title != nome_planilha:
+            spreadsheet = None
+
+    if spreadsheet is None:
+        spreadsheet = client.open(nome_planilha)
+
+    with _lock_cliente:
+        if spreadsheet.id != planilha_id:
+            ids[nome_planilha] = {'id': spreadsheet.id, 'salvo_em': time.time()}
+            _salvar_ids()
+        _planilhas[spreadsheet.id] = spreadsheet
+    return spreadsheet
+
+def _agrupar_consecutivos(numeros):
+    """Agrupa números ordenados em faixas (inicio, fim) de valores consecutivos"""
+    faixas = []
+    for numero in numeros:
+        if faixas and numero == faixas[-1][1] + 1:
+            faixas[-1][1] = numero
+        else:
+            faixas.append([numero, numero])
+    return [tuple(faixa) for faixa in faixas]
+
+def _tamanho_json(linha):
+    """Estimativa do JSON da linha: aspas e vírgula por célula, colchetes por linha"""
+    return sum(len(valor) + 3 for valor in linha) + 2
+
+def _lotes(linhas, max_linhas=LINHAS_POR_LOTE, max_bytes=BYTES_POR_LOTE):
+    """Agrupa as linhas em lotes de até `max_linhas` linhas e ~`max_bytes` bytes de JSON"""
+    lote = []
+    tamanho = 0
+    for linha in linhas:
+        tamanho_linha = _tamanho_json(linha)
+        if lote and (len(lote) >= max_linhas or tamanho + tamanho_linha > max_bytes):
+            yield lote
+            lote = []
+            tamanho = 0
+        lote.append(linha)
+        tamanho += tamanho_linha
+    if lote:
+        yield lote
+
+def _status_da_falha(erro):
+    """Status HTTP de um erro da API (gspread.exceptions.APIError guarda a resposta), se houver"""
+    resposta = getattr(erro, 'response', None)
+    return getattr(resposta, 'status_code', None)
+
+class EnvioCancelado(Exception):
+    """`deve_parar()` ficou verdadeiro enquanto o EscritorAba esperava para repetir uma chamada"""
+
+class EscritorAba:
+    """
+    Faz as chamadas à aba respeitando a cota de escrita e repetindo falhas temporárias.
+
+    As chamadas ficam espaçadas em pelo menos `intervalo_minimo` segundos.
+    Respostas 429/5xx e falhas de conexão são repetidas até `tentativas`
+    vezes com espera exponencial (com jitter), ou pelo Retry-After do servidor,
+    sempre limitada a ESPERA_MAXIMA. As chamadas de METODOS_NAO_IDEMPOTENTES
+    só são repetidas após 429, quando o servidor recusou o pedido sem aplicá-lo.
+    A espera é feita em fatias: com `deve_parar()` verdadeiro ela é
+    interrompida e `chamar` levanta EnvioCancelado.
+    """
+
+    def __init__(self, sheet, intervalo_minimo=INTERVALO_MINIMO, tentativas=TENTATIVAS, espera=time.sleep,
+                 deve_parar=None):
+        self.sheet = sheet
+        self.intervalo_minimo = intervalo_minimo
+        self.tentativas = tentativas
+        self.espera = espera
+        self.deve_parar = deve_parar
+        self.requisicoes = 0
+        self.retentativas = 0
+        self._ultima_chamada = None
+
+    def _aguardar_vez(self):
+        if self._ultima_chamada is not None:
+            restante = self.intervalo_minimo - (time.monotonic() - self._ultima_chamada)
+            if restante > 0:
+                self.espera(restante)
+        self._ultima_chamada = time.monotonic()
+
+    def chamar(self, metodo, *args, **kwargs):
+        """Chama `sheet.<metodo>(*args, **kwargs)` com limite de taxa e retentativas"""
+        for tentativa in range(self.tentativas):
+            self._aguardar_vez()
+            self.requisicoes += 1
+            try:
+                return getattr(self.sheet, metodo)(*args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if metodo in METODOS_NAO_IDEMPOTENTES:
+                    raise
+                erro, retry_after = e, None
+            except Exception as e:
+                status = _status_da_falha(e)
+                if status not in STATUS_TEMPORARIOS or (status != 429 and metodo in METODOS_NAO_IDEMPOTENTES):
+                    raise
+                erro, retry_after = e, e.response.headers.get('Retry-After')
+
+            if tentativa == self.tentativas - 1:
+                raise erro
+
+            self.retentativas += 1
+            try:
+                espera = min(ESPERA_MAXIMA, float(retry_after))
+            except (TypeError, ValueError):
+                espera = min(ESPERA_MAXIMA, 2 ** tentativa) + random.uniform(0, 1)
+            self._esperar_retentativa(espera)
+
+    def _esperar_retentativa(self, segundos):
+        """Espera em fatias de até 1 s para que o cancelamento não fique preso na espera"""
+        restante = segundos
+        while restante > 0:
+            if self.deve_parar and self.deve_parar():
+                raise EnvioCancelado()
+            fatia = min(restante, 1.0)
+            self.espera(fatia)
+            restante -= fatia
+
+@dataclass
+class DeltaPlanilha:
+    """Diferenças entre a aba e os dados novos (linhas numeradas como na planilha, com cabeçalho na 1)"""
+    alteradas: Dict[int, List[str]] = field(default_factory=dict)
+    removidas: List[int] = field(default_factory=list)
+    inseridas: List[List[str]] = field(default_factory=list)
+    inalteradas: int = 0
+
+    @property
+    def vazio(self):
+        return not (self.alteradas or self.removidas or self.inseridas)
+
+def calcular_delta(valores_atuais, cabecalho, linhas, coluna_chave=COLUNA_CHAVE):
+    """
+    Compara o conteúdo atual da aba (`get_all_values()`) com as linhas novas.
+
+    As linhas são casadas pelo valor da `coluna_chave`. Uma linha da aba cuja
+    chave não aparece nos dados novos (ou que repete uma chave já vista) é
+    removida; uma chave nova é inserida no fim. Retorna None quando a aba está
+    vazia ou o cabeçalho mudou, casos em que só a reescrita completa serve.
+    """
+    if not valores_atuais or valores_atuais[0][:len(cabecalho)] != cabecalho:
+        return None
+    if any(valor for valor in valores_atuais[0][len(cabecalho):]):
+        return None
+
+    indice_chave = cabecalho.index(coluna_chave)
+    largura = len(cabecalho)
+    delta = DeltaPlanilha()
+
+    novas = {}
+    for linha in linhas:
+        novas.setdefault(linha[indice_chave], linha)
+
+    vistas = set()
+    for numero, atual in enumerate(valores_atuais[1:], start=2):
+        # get_all_values() não devolve células vazias no fim da linha
+        atual = (atual + [""] * largura)[:largura]
+        chave = atual[indice_chave]
+        nova = novas.get(chave)
+        if nova is None or chave in vistas:
+            delta.removidas.append(numero)
+            continue
+        vistas.add(chave)
+        if nova == atual:
+            delta.inalteradas += 1
+        else:
+            delta.alteradas[numero] = nova
+
+    delta.inseridas = [linha for chave, linha in novas.items() if chave not in vistas]
+    return delta
+
+def aplicar_delta(sheet, delta, largura, callback_progresso=None, deve_parar=None, escritor=None):
+    """
+    Envia só as diferenças: `batch_update` com as faixas de linhas alteradas,
+    `delete_rows` de baixo para cima (para não deslocar as próximas faixas)
+    e `append_rows` com as novas, sempre em lotes dentro dos limites da API.
+
+    `callback_progresso(linhas_processadas)` é chamado após cada requisição.
+    Retorna False se `deve_parar()` interrompeu o envio.
+    """
+    escritor = escritor or EscritorAba(sheet, deve_parar=deve_parar)
+    try:
+        return _aplicar_delta(escritor, delta, largura, callback_progresso, deve_parar)
+    except EnvioCancelado:
+        return False
+
+def _aplicar_delta(escritor, delta, largura, callback_progresso, deve_parar):
+    """Corpo de `aplicar_delta`; o EnvioCancelado do escritor sobe para ela"""
+    col_final = letra_coluna(largura)
+    processadas = 0
+
+    def parar():
+        return bool(deve_parar and deve_parar())
+
+    def avancar(linhas):
+        nonlocal processadas
+        processadas += linhas
+        if callback_progresso:
+            callback_progresso(processadas)
+
+    # As faixas alteradas são agrupadas em lotes; uma faixa maior que o lote é quebrada
+    faixas = []
+    for inicio, fim in _agrupar_consecutivos(sorted(delta.alteradas)):
+        for lote in _lotes(delta.alteradas[numero] for numero in range(inicio, fim + 1)):
+            faixas.append((inicio, lote))
+            inicio += len(lote)
+
+    ranges = []
+    linhas_no_lote = 0
+    bytes_no_lote = 0
+    for inicio, valores in faixas:
+        tamanho = sum(_tamanho_json(linha) for linha in valores)
+        if ranges and (linhas_no_lote + len(valores) > LINHAS_POR_LOTE
+                       or bytes_no_lote + tamanho > BYTES_POR_LOTE):
+            if parar():
+                return False
+            escritor.chamar('batch_update', ranges)
+            avancar(linhas_no_lote)
+            ranges = []
+            linhas_no_lote = 0
+            bytes_no_lote = 0
+        ranges.append({'range': f'A{inicio}:{col_final}{inicio + len(valores) - 1}', 'values': valores})
+        linhas_no_lote += len(valores)
+        bytes_no_lote += tamanho
+    if ranges:
+        if parar():
+            return False
+        escritor.chamar('batch_update', ranges)
+        avancar(linhas_no_lote)
+
+    for inicio, fim in reversed(_agrupar_consecutivos(delta.removidas)):
+        if parar():
+            return False
+        escritor.chamar('delete_rows', inicio, fim)
+        avancar(fim - inicio + 1)
+
+    for lote in _lotes(delta.inseridas):
+        if parar():
+            return False
+        escritor.chamar('append_rows', lote, table_range=f'A1:{col_final}1')
+        avancar(len(lote))
+
+    return True
+
+def reescrever_aba(sheet, cabecalho, blocos, callback_progresso=None, deve_parar=None, escritor=None):
+    """
+    Limpa a aba e grava o cabeçalho e as linhas a partir de A1, em lotes.
+
+    `blocos` é um iterável de listas de linhas (ex.: um bloco por pedaço do
+    CSV lido em streaming), então só um bloco fica na memória por vez.
+    A grade da aba é aumentada com `add_rows` quando os lotes passam do fim.
+    Retorna o número de linhas enviadas (sem o cabeçalho).
+    """
+    escritor = escritor or EscritorAba(sheet, deve_parar=deve_parar)
+    largura = len(cabecalho)
+    col_final = letra_coluna(largura)
+    enviadas = 0
+
+    try:
+        escritor.chamar('clear')
+        if sheet.col_count < largura:
+            escritor.chamar('add_cols', largura - sheet.col_count)
+        linhas_na_grade = sheet.row_count
+        escritor.chamar('update', values=[cabecalho], range_name=f'A1:{col_final}1')
+
+        proxima_linha = 2
+        for bloco in blocos:
+            for lote in _lotes(bloco):
+                if deve_parar and deve_parar():
+                    return enviadas
+
+                ultima_linha = proxima_linha + len(lote) - 1
+                if ultima_linha > linhas_na_grade:
+                    escritor.chamar('add_rows', ultima_linha - linhas_na_grade)
+                    linhas_na_grade = ultima_linha
+
+                escritor.chamar('update', values=lote, range_name=f'A{proxima_linha}:{col_final}{ultima_linha}')
+                proxima_linha = ultima_linha + 1
+                enviadas += len(lote)
+                if callback_progresso:
+                    callback_progresso(enviadas)
+    except EnvioCancelado:
+        pass
+
+    return enviadas
+
+def sincronizar_aba(sheet, df, coluna_chave=COLUNA_CHAVE, callback_progresso=None, deve_parar=None):
+    """
+    Atualiza a aba com o DataFrame enviando apenas as linhas inseridas,
+    alteradas e removidas (comparadas por `coluna_chave`).
+
+    Cai na reescrita completa se a aba estiver vazia ou com outro cabeçalho.
+    Chaves repetidas no DataFrame mantêm só a primeira ocorrência.
+    Retorna o DeltaPlanilha aplicado, ou None se a aba foi reescrita.
+    """
+    escritor = EscritorAba(sheet, deve_parar=deve_parar)
+    cabecalho = [str(coluna) for coluna in df.columns]
+    linhas = [[str(valor) for valor in linha] for linha in df.itertuples(index=False, name=None)]
+
+    delta = calcular_delta(escritor.chamar('get_all_values'), cabecalho, linhas, coluna_chave)
+    if delta is None:
+        reescrever_aba(sheet, cabecalho, [linhas], callback_progresso, deve_parar, escritor)
+        return None
+
+    aplicar_delta(sheet, delta, len(cabecalho), callback_progresso, deve_parar, escritor)
+    return delta
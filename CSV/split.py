@@ -0,0 +1,351 @@
+import io
+import os
+import re
+import csv
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Tamanho dos blocos lidos na contagem de registros
+TAMANHO_BLOCO = 1024 * 1024
+# Tamanho máximo de cada bloco enviado ao pool de gravação
+TAMANHO_BLOCO_ESCRITA = 4 * 1024 * 1024
+GRAVADORES_PADRAO = 4
+# Limite de arquivos abertos ao mesmo tempo na divisão por coluna
+MAX_ARQUIVOS_ABERTOS = 64
+BOM_UTF8 = b"\xef\xbb\xbf"
+
+# Linha em branco (só espaços) terminada por quebra de linha; a quebra anterior a ela é a que casa
+LINHA_EM_BRANCO = re.compile(rb"\n[ \t\r\f\v]*(?=\n)")
+LINHA_EM_BRANCO_INICIO = re.compile(rb"(?:\A|\n)[ \t\r\f\v]*(?=\n)")
+
+def contar_registros_csv(file_path):
+    """Conta os registros do CSV (sem o cabeçalho) sem montar um DataFrame"""
+    # Varre os bytes em blocos: separando por aspas, os trechos de índice par
+    # estão fora de campos entre aspas, então só as quebras de linha deles contam.
+    # Linhas em branco não são registros (como em iterar_registros e no pandas):
+    # elas nunca têm aspas, então cabem inteiras num trecho. Cada bloco termina
+    # numa quebra de linha, então o primeiro trecho fora de aspas começa uma linha.
+    em_aspas = False
+    quebras = 0
+    cauda = b""
+
+    with open(file_path, 'rb') as arquivo:
+        while True:
+            bloco = arquivo.read(TAMANHO_BLOCO)
+            if not bloco:
+                break
+            if not bloco.endswith(b"\n"):
+                bloco += arquivo.readline()
+
+            for i, trecho in enumerate(bloco.split(b'"')):
+                if i > 0:
+                    em_aspas = not em_aspas
+                if not em_aspas:
+                    em_branco = LINHA_EM_BRANCO_INICIO if i == 0 else LINHA_EM_BRANCO
+                    quebras += trecho.count(b"\n") - len(em_branco.findall(trecho))
+            cauda = bloco[bloco.rfind(b"\n") + 1:]
+
+    # A última linha pode não terminar com quebra de linha
+    linhas = quebras + (1 if em_aspas or cauda.strip() else 0)
+    return max(0, linhas - 1)
+
+def estimar_registros_csv(file_path, tamanho_amostra=TAMANHO_BLOCO):
+    """
+    Estima os registros do CSV (sem o cabeçalho) lendo só os primeiros `tamanho_amostra` bytes.
+
+    O tamanho médio dos registros da amostra é extrapolado para o tamanho do
+    arquivo; arquivos menores que a amostra são contados exatamente.
+    """
+    tamanho_arquivo = os.path.getsize(file_path)
+    with open(file_path, 'rb') as arquivo:
+        amostra = arquivo.read(tamanho_amostra)
+    completa = len(amostra) >= tamanho_arquivo
+    if not completa:
+        amostra = amostra[:amostra.rfind(b"\n") + 1]  # Descarta a linha cortada
+
+    registros = iterar_registros(io.BytesIO(amostra))
+    cabecalho = next(registros, None)
+    if cabecalho is None:
+        return 0
+    contados = 0
+    bytes_registros = 0
+    for registro in registros:
+        contados += 1
+        bytes_registros += len(registro)
+    if completa or not contados:
+        return contados
+    return round((tamanho_arquivo - len(cabecalho)) * contados / bytes_registros)
+
+def iterar_registros(arquivo):
+    """Gera os registros brutos (bytes) de um CSV aberto em modo binário"""
+    # Uma linha com número ímpar de aspas abre (ou fecha) um campo com quebra de linha
+    pendente = []
+    em_aspas = False
+
+    for linha in arquivo:
+        if linha.count(b'"') % 2:
+            em_aspas = not em_aspas
+
+        if em_aspas:
+            pendente.append(linha)
+            continue
+
+        if pendente:
+            pendente.append(linha)
+            linha = b"".join(pendente)
+            pendente = []
+        elif not linha.strip():
+            continue  # Linhas em branco são ignoradas, como no pandas
+
+        yield linha
+
+    if pendente:
+        yield b"".join(pendente)
+
+def ler_cabecalho(registros):
+    """Retorna o cabeçalho (sem BOM e com quebra de linha) ou None se o arquivo estiver vazio"""
+    cabecalho = next(registros, None)
+    if cabecalho is None:
+        return None
+
+    if cabecalho.startswith(BOM_UTF8):
+        cabecalho = cabecalho[len(BOM_UTF8):]
+    if not cabecalho.endswith(b"\n"):
+        cabecalho += b"\n"
+    return cabecalho
+
+class GravadorParalelo:
+    """
+    Grava blocos de bytes em posições fixas de arquivos usando um pool de threads.
+
+    No máximo `max_pendentes` blocos ficam na fila, então a memória usada é
+    limitada a `max_pendentes` x tamanho do bloco. Cada bloco abre o próprio
+    handle e grava na sua posição, então a ordem de conclusão não importa.
+    """
+
+    def __init__(self, max_workers=GRAVADORES_PADRAO, max_pendentes=None, callback_progresso=None):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="csv-split")
+        self.vagas = threading.BoundedSemaphore(max_pendentes or max_workers * 2)
+        self.callback_progresso = callback_progresso
+        self.registros_gravados = 0
+        self.bytes_gravados = 0
+        self.erro = None
+        self._lock = threading.Lock()
+
+    def enviar(self, caminho, posicao, dados, num_registros):
+        """Agenda a gravação (bloqueia enquanto a fila estiver cheia)"""
+        if self.erro:
+            raise self.erro
+        self.vagas.acquire()
+        try:
+            self.pool.submit(self._gravar, caminho, posicao, dados, num_registros)
+        except BaseException:
+            self.vagas.release()
+            raise
+
+    def _gravar(self, caminho, posicao, dados, num_registros):
+        try:
+            with open(caminho, 'r+b') as arquivo:
+                arquivo.seek(posicao)
+                arquivo.write(dados)
+
+            with self._lock:
+                self.registros_gravados += num_registros
+                self.bytes_gravados += len(dados)
+                registros_gravados = self.registros_gravados
+                bytes_gravados = self.bytes_gravados
+            if self.callback_progresso:
+                self.callback_progresso(registros_gravados, bytes_gravados)
+        except Exception as e:
+            self.erro = self.erro or e
+        finally:
+            self.vagas.release()
+
+    def finalizar(self):
+        """Espera as gravações pendentes e repassa o primeiro erro, se houver"""
+        self.pool.shutdown(wait=True)
+        if self.erro:
+            raise self.erro
+
+def dividir_csv_em_partes(file_path, linhas_por_arquivo, pasta_destino="CSV",
+                          callback_progresso=None, deve_parar=None,
+                          max_workers=GRAVADORES_PADRAO, tamanho_bloco=TAMANHO_BLOCO_ESCRITA):
+    """
+    Divide o CSV em arquivos de `linhas_por_arquivo` registros, em uma única passada.
+
+    Os registros são copiados como bytes (sem reinterpretar aspas ou tipos) e
+    gravados em paralelo, em blocos de até `tamanho_bloco` bytes, por um
+    GravadorParalelo; a memória usada não depende do tamanho do arquivo.
+    `callback_progresso(registros_gravados, bytes_gravados)` é chamado das
+    threads de gravação; os bytes são os dos registros, sem os cabeçalhos das partes.
+    Retorna a lista com os nomes dos arquivos criados, em ordem.
+    """
+    def nova_parte(registros_na_parte, bytes_na_parte, registro):
+        return registros_na_parte == linhas_por_arquivo
+
+    return _dividir_sequencial(file_path, nova_parte, pasta_destino, callback_progresso,
+                               deve_parar, max_workers, tamanho_bloco)
+
+def dividir_csv_por_tamanho(file_path, max_bytes, pasta_destino="CSV",
+                            callback_progresso=None, deve_parar=None,
+                            max_workers=GRAVADORES_PADRAO, tamanho_bloco=TAMANHO_BLOCO_ESCRITA):
+    """
+    Divide o CSV em arquivos de no máximo `max_bytes` bytes (cabeçalho incluído).
+
+    Um registro maior que o limite sozinho vai para uma parte própria.
+    Retorna a lista com os nomes dos arquivos criados, em ordem.
+    """
+    def nova_parte(registros_na_parte, bytes_na_parte, registro):
+        return registros_na_parte > 0 and bytes_na_parte + len(registro) > max_bytes
+
+    return _dividir_sequencial(file_path, nova_parte, pasta_destino, callback_progresso,
+                               deve_parar, max_workers, tamanho_bloco)
+
+def _dividir_sequencial(file_path, nova_parte, pasta_destino, callback_progresso,
+                        deve_parar, max_workers, tamanho_bloco):
+    """Motor das divisões em partes consecutivas: `nova_parte` decide onde cortar"""
+    nome_base = os.path.splitext(os.path.basename(file_path))[0]
+    os.makedirs(pasta_destino, exist_ok=True)
+    arquivos_criados = []
+    gravador = GravadorParalelo(max_workers=max_workers, callback_progresso=callback_progresso)
+
+    # Bloco em montagem: parte de destino, posição no arquivo e registros acumulados
+    caminho_parte = None
+    posicao = 0
+    bloco = []
+    tamanho = 0
+    registros_na_parte = 0
+
+    def enviar_bloco():
+        nonlocal posicao, bloco, tamanho
+        if bloco:
+            gravador.enviar(caminho_parte, posicao, b"".join(bloco), len(bloco))
+            posicao += tamanho
+            bloco = []
+            tamanho = 0
+
+    try:
+        with open(file_path, 'rb') as arquivo:
+            registros = iterar_registros(arquivo)
+            cabecalho = ler_cabecalho(registros)
+            if cabecalho is None:
+                return arquivos_criados
+
+            for registro in registros:
+                if caminho_parte is None or nova_parte(registros_na_parte, posicao + tamanho, registro):
+                    if deve_parar and deve_parar():
+                        break
+                    enviar_bloco()
+
+                    # Nomes determinísticos: a numeração segue a ordem de leitura
+                    nome_arquivo = f"{nome_base}_parte_{len(arquivos_criados) + 1:03d}.csv"
+                    caminho_parte = os.path.join(pasta_destino, nome_arquivo)
+                    with open(caminho_parte, 'wb') as parte:
+                        parte.write(cabecalho)
+                    posicao = len(cabecalho)
+                    registros_na_parte = 0
+                    arquivos_criados.append(nome_arquivo)
+
+                bloco.append(registro)
+                tamanho += len(registro)
+                registros_na_parte += 1
+                if tamanho >= tamanho_bloco:
+                    if deve_parar and deve_parar():
+                        break
+                    enviar_bloco()
+
+            enviar_bloco()
+    finally:
+        gravador.finalizar()
+
+    return arquivos_criados
+
+def ler_colunas(file_path, encoding='utf-8'):
+    """Retorna os nomes das colunas do CSV lendo apenas o cabeçalho"""
+    with open(file_path, 'rb') as arquivo:
+        cabecalho = ler_cabecalho(iterar_registros(arquivo))
+    if cabecalho is None:
+        return []
+    return next(csv.reader([cabecalho.decode(encoding, errors='replace')]))
+
+def _nome_seguro(valor):
+    """Converte o valor da coluna em um trecho válido de nome de arquivo"""
+    nome = re.sub(r'[^\w.-]+', '_', valor.strip()).strip('._')
+    return nome[:80] or "vazio"
+
+def dividir_csv_por_coluna(file_path, coluna, pasta_destino="CSV",
+                           callback_progresso=None, deve_parar=None,
+                           max_arquivos_abertos=MAX_ARQUIVOS_ABERTOS, encoding='utf-8'):
+    """
+    Gera um arquivo por valor da `coluna` (ex.: "id da categoria pai"), em uma única passada.
+
+    Só o campo da coluna é interpretado; o registro é copiado como bytes.
+    No máximo `max_arquivos_abertos` arquivos ficam abertos: os usados há mais
+    tempo são fechados e reabertos em modo append quando o valor reaparece.
+    `callback_progresso(registros_gravados, bytes_lidos)` é chamado a cada 10.000 registros.
+    Retorna a lista com os nomes dos arquivos criados, na ordem em que cada valor apareceu.
+    """
+    nome_base = os.path.splitext(os.path.basename(file_path))[0]
+    os.makedirs(pasta_destino, exist_ok=True)
+    nomes_por_valor = {}
+    nomes_usados = set()
+    abertos = OrderedDict()  # nome do arquivo -> handle, em ordem de uso (LRU)
+
+    def arquivo_para(valor):
+        nome_arquivo = nomes_por_valor.get(valor)
+        novo = nome_arquivo is None
+        if novo:
+            # Valores diferentes podem gerar o mesmo nome seguro: desempata com sufixo
+            nome_arquivo = f"{nome_base}_{_nome_seguro(valor)}.csv"
+            sufixo = 2
+            while nome_arquivo.lower() in nomes_usados:
+                nome_arquivo = f"{nome_base}_{_nome_seguro(valor)}_{sufixo}.csv"
+                sufixo += 1
+            nomes_usados.add(nome_arquivo.lower())
+            nomes_por_valor[valor] = nome_arquivo
+
+        handle = abertos.get(nome_arquivo)
+        if handle is not None:
+            abertos.move_to_end(nome_arquivo)
+            return handle
+
+        if len(abertos) >= max_arquivos_abertos:
+            _, mais_antigo = abertos.popitem(last=False)
+            mais_antigo.close()
+
+        handle = open(os.path.join(pasta_destino, nome_arquivo), 'wb' if novo else 'ab')
+        if novo:
+            handle.write(cabecalho)
+        abertos[nome_arquivo] = handle
+        return handle
+
+    try:
+        with open(file_path, 'rb') as arquivo:
+            registros = iterar_registros(arquivo)
+            cabecalho = ler_cabecalho(registros)
+            if cabecalho is None:
+                return []
+
+            colunas = next(csv.reader([cabecalho.decode(encoding, errors='replace')]))
+            if coluna not in colunas:
+                raise ValueError(f"Coluna '{coluna}' não encontrada no arquivo")
+            indice_coluna = colunas.index(coluna)
+            bytes_lidos = len(cabecalho)
+
+            for indice, registro in enumerate(registros, start=1):
+                bytes_lidos += len(registro)
+                campos = next(csv.reader([registro.decode(encoding, errors='replace')]), [])
+                valor = campos[indice_coluna] if indice_coluna < len(campos) else ""
+                arquivo_para(valor).write(registro if registro.endswith(b"\n") else registro + b"\n")
+
+                if indice % 10000 == 0:
+                    if callback_progresso:
+                        callback_progresso(indice, bytes_lidos)
+                    if deve_parar and deve_parar():
+                        break
+    finally:
+        for handle in abertos.values():
+            handle.close()
+
+    return list(nomes_por_valor.values())
@@ -1,14 +1,47 @@
+import threading
 import pandas as pd
-import smtplib
-from PySide6.QtWidgets import (QFileDialog, QMessageBox, QInputDialog, QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton, QTextEdit)
-from PySide6.QtCore import Qt
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from PySide6.QtWidgets import (QFileDialog, QMessageBox, QInputDialog, QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton, QTextEdit, QCheckBox)
+from PySide6.QtCore import Qt, QThread, Signal
+from EMAIL.smtp import DisparadorEmails, SessaoSMTP
+from EMAIL.tarefas import criar_corpo_email_completo, criar_corpo_email_html, iterar_categorias
 from EMAIL.especialistas import dicionario, obter_responsavel_por_categoria
 from EMAIL.config import CONFIG_EMAIL
 
+class EmailWorker(QThread):
+    """
+    Thread para o envio de e-mails em background
+    
+    Recebe uma tarefa `tarefa(callback_progresso, callback_contagem, deve_parar) -> resultado`,
+    montada por enviar_email_seed depois de coletar as opções na interface.
+    """
+    progress_signal = Signal(int, int, str)  # (categorias concluídas, total, mensagem)
+    contagem_signal = Signal(int, int, int)  # (enviados, falhas, sem responsável)
+    finished_signal = Signal(dict)  # resultado do envio
+    error_signal = Signal(str)  # mensagem de erro
+    
+    def __init__(self, tarefa):
+        super().__init__()
+        self.tarefa = tarefa
+        self.is_running = True
+    
+    def run(self):
+        try:
+            resultado = self.tarefa(self.progress_signal.emit, self.contagem_signal.emit, lambda: not self.is_running)
+            self.finished_signal.emit(resultado)
+        except Exception as e:
+            self.error_signal.emit(f"Erro ao processar e enviar e-mails: {str(e)}")
+    
+    def stop(self):
+        """Pede o cancelamento; nenhuma mensagem nova é enviada depois disso"""
+        self.is_running = False
+
 def enviar_email_seed(parent_window):
-    """Função para enviar e-mails separados por categoria para os responsáveis"""
+    """
+    Função para enviar e-mails separados por categoria para os responsáveis
+    
+    Coleta arquivo e configuração na interface e retorna a tarefa para o EmailWorker
+    (ou None se cancelado). A leitura do CSV e os envios acontecem na tarefa.
+    """
     try:
         # Abrir diálogo para selecionar arquivo CSV
         file_path, _ = QFileDialog.getOpenFileName(
@@ -21,13 +54,13 @@ def enviar_email_seed(parent_window):
         if not file_path:
             return
         
-        # Ler o arquivo CSV
-        df = pd.read_csv(file_path)
+        # Ler só o cabeçalho para validar as colunas
+        colunas_detectadas = pd.read_csv(file_path, nrows=0).columns.tolist()
         
         # Verificar se as colunas obrigatórias existem
         colunas_necessarias = ['Categoria', 'Tarefa']
         for coluna in colunas_necessarias:
-            if coluna not in df.columns:
+            if coluna not in colunas_detectadas:
                 QMessageBox.critical(
                     parent_window, 
                     "Erro", 
@@ -36,7 +69,6 @@ def enviar_email_seed(parent_window):
                 return
         
         # Mostrar colunas detectadas
-        colunas_detectadas = list(df.columns)
         QMessageBox.information(
             parent_window,
             "Colunas Detectadas", 
@@ -48,101 +80,106 @@ def enviar_email_seed(parent_window):
         if not config:
             return
         
-        # Processar as categorias e enviar e-mails
-        resultado = processar_categorias_e_enviar_emails(df, config, parent_window)
+        def tarefa(callback_progresso, callback_contagem, deve_parar):
+            # Ler o arquivo CSV
+            callback_progresso(0, 0, "Lendo arquivo...")
+            df = pd.read_csv(file_path)
+            
+            # Processar as categorias e enviar e-mails
+            return processar_categorias_e_enviar_emails(
+                df, config, parent_window, callback_progresso, callback_contagem, deve_parar
+            )
         
-        # Mostrar resultado
-        mostrar_resultado_envio(resultado, parent_window)
+        return tarefa
         
     except Exception as e:
         QMessageBox.critical(parent_window, "Erro", f"Erro ao processar e enviar e-mails: {str(e)}")
 
-def processar_categorias_e_enviar_emails(df, config, parent_window):
+def processar_categorias_e_enviar_emails(df, config, parent_window, callback_progresso=None,
+                                        callback_contagem=None, deve_parar=None):
     """
     Processa o DataFrame por categorias e envia e-mails para os responsáveis
+    
+    `callback_progresso(concluidas, total, mensagem)` e `callback_contagem(enviados, falhas,
+    sem_responsavel)` são chamados a cada categoria concluída, das threads de envio.
+    Com `deve_parar()` verdadeiro, nenhuma mensagem nova é enviada.
     """
     resultado = {
         'enviados': 0,
         'falhas': [],
         'categorias_sem_responsavel': [],
-        'categorias_processadas': []
+        'categorias_processadas': [],
+        'cancelado': False
     }
     
-    # Agrupar por categoria
-    categorias = df['Categoria'].unique()
-    
-    for categoria in categorias:
-        try:
-            # Obter e-mail do responsável
-            email_responsavel = obter_responsavel_por_categoria(categoria)
-            
-            if not email_responsavel:
-                resultado['categorias_sem_responsavel'].append(categoria)
+    lock_resultado = threading.Lock()
+    ordem = {}
+    total_categorias = df['Categoria'].nunique(dropna=False)
+    
+    def avisar(mensagem):
+        """Repassa o andamento (chamado com lock_resultado adquirido)"""
+        concluidas = resultado['enviados'] + len(resultado['falhas']) + len(resultado['categorias_sem_responsavel'])
+        if callback_progresso:
+            callback_progresso(concluidas, total_categorias, mensagem)
+        if callback_contagem:
+            callback_contagem(resultado['enviados'], len(resultado['falhas']),
+                              len(resultado['categorias_sem_responsavel']))
+    
+    # Corpo em texto (padrão) ou em tabela HTML
+    if config.get('formato_corpo') == 'html':
+        criar_corpo, subtipo = criar_corpo_email_html, 'html'
+    else:
+        criar_corpo, subtipo = criar_corpo_email_completo, 'plain'
+    
+    def gerar_mensagens():
+        """Gera as mensagens sob demanda, enquanto o pool envia as anteriores"""
+        # Agrupar por categoria (uma passada só, na ordem do arquivo)
+        for categoria, tarefas_categoria in iterar_categorias(df):
+            ordem[categoria] = len(ordem)
+            try:
+                # Obter e-mail do responsável
+                email_responsavel = obter_responsavel_por_categoria(categoria)
+                
+                if not email_responsavel:
+                    with lock_resultado:
+                        resultado['categorias_sem_responsavel'].append(categoria)
+                        avisar(f"{categoria}: sem responsável")
+                    continue
+                
+                # Criar corpo do e-mail com TODAS as colunas
+                corpo_email = criar_corpo(categoria, tarefas_categoria)
+                
+                # Assunto do e-mail
+                assunto = f"Tarefas - Categoria {categoria}"
+                
+            except Exception as e:
+                with lock_resultado:
+                    resultado['falhas'].append(f"{categoria}: {str(e)}")
+                    avisar(f"{categoria}: falha")
                 continue
             
-            # Filtrar tarefas da categoria
-            tarefas_categoria = df[df['Categoria'] == categoria]
-            
-            # Criar corpo do e-mail com TODAS as colunas
-            corpo_email = criar_corpo_email_completo(categoria, tarefas_categoria)
-            
-            # Assunto do e-mail
-            assunto = f"Tarefas - Categoria {categoria}"
-            
-            # Enviar e-mail
-            enviar_email_unico(
-                config['email'],
-                config['senha'],
-                config['smtp_server'],
-                config['smtp_port'],
-                email_responsavel,
-                assunto,
-                corpo_email
-            )
-            
-            resultado['enviados'] += 1
-            resultado['categorias_processadas'].append(categoria)
-            
-        except Exception as e:
-            resultado['falhas'].append(f"{categoria}: {str(e)}")
+            yield categoria, email_responsavel, assunto, corpo_email, subtipo
+    
+    def registrar_envio(categoria, erro):
+        """Chamado pelas threads do pool após cada envio"""
+        with lock_resultado:
+            if erro is None:
+                resultado['enviados'] += 1
+                resultado['categorias_processadas'].append(categoria)
+                avisar(f"{categoria}: enviado")
+            else:
+                resultado['falhas'].append(f"{categoria}: {str(erro)}")
+                avisar(f"{categoria}: falha")
+    
+    # Enviar em paralelo por um pool de conexões SMTP (cada uma reaproveitada)
+    DisparadorEmails.da_configuracao(config).enviar_todas(gerar_mensagens(), registrar_envio, deve_parar)
+    resultado['cancelado'] = bool(deve_parar and deve_parar())
+    
+    # Os envios terminam fora de ordem: manter a ordem das categorias no arquivo
+    resultado['categorias_processadas'].sort(key=lambda categoria: ordem.get(categoria, len(ordem)))
     
     return resultado
 
-def criar_corpo_email_completo(categoria, tarefas_df):
-    """
-    Cria o corpo do e-mail com TODAS as colunas do DataFrame
-    """
-    # Obter todas as colunas (exceto Categoria se quiser)
-    colunas = [col for col in tarefas_df.columns if col != 'Categoria']
-    
-    corpo = f"""Prezado Responsável pela Categoria {categoria},
-
-Segue a lista detalhada de tarefas para sua área:
-
-"""
-    
-    # Para cada tarefa, mostrar todas as colunas
-    for index, row in tarefas_df.iterrows():
-        corpo += f"📋 Tarefa {index + 1}:\n"
-        
-        for coluna in colunas:
-            valor = row[coluna]
-            # Formatar valores NaN ou vazios
-            if pd.isna(valor) or valor == "":
-                valor = "Não informado"
-            corpo += f"   • {coluna}: {valor}\n"
-        
-        corpo += "\n"  # Espaço entre tarefas
-    
-    corpo += f"""
-Total de tarefas: {len(tarefas_df)}
-
-Atenciosamente,
-Sistema de Automação
-"""
-    
-    return corpo
-
 def obter_configuracao_email(parent_window):
     """Obtém as configurações de e-mail - usa salvas ou pergunta ao usuário"""
     # Verificar se as configurações estão preenchidas no config.py
@@ -214,28 +251,14 @@ def obter_configuracao_email_interativo(parent_window):
     }
 
 def enviar_email_unico(remetente, senha, smtp_server, smtp_port, destinatario, assunto, corpo):
-    """Envia um único e-mail"""
-    # Criar mensagem
-    msg = MIMEMultipart()
-    msg['From'] = remetente
-    msg['To'] = destinatario
-    msg['Subject'] = assunto
-    
-    # Adicionar corpo do e-mail
-    msg.attach(MIMEText(corpo, 'plain'))
-    
-    # Conectar e enviar e-mail
-    server = smtplib.SMTP(smtp_server, smtp_port)
-    server.starttls()
-    server.login(remetente, senha)
-    text = msg.as_string()
-    server.sendmail(remetente, destinatario, text)
-    server.quit()
+    """Envia um único e-mail (abre e fecha a própria conexão)"""
+    with SessaoSMTP(smtp_server, smtp_port, remetente, senha) as sessao:
+        sessao.enviar(destinatario, assunto, corpo)
 
 def mostrar_resultado_envio(resultado, parent_window):
     """Mostra o resultado do envio de e-mails"""
     mensagem = f"""
-RESULTADO DO ENVIO:
+RESULTADO DO ENVIO{' (CANCELADO)' if resultado.get('cancelado') else ''}:
 
 ✅ E-mails enviados com sucesso: {resultado['enviados']}
 📋 Categorias processadas: {', '.join(resultado['categorias_processadas']) if resultado['categorias_processadas'] else 'Nenhuma'}
@@ -299,7 +322,7 @@ def configurar_email(parent_window):
     """Janela para configurar e-mail e senha"""
     dialog = QDialog(parent_window)
     dialog.setWindowTitle("Configuração de E-mail")
-    dialog.setFixedSize(400, 350)
+    dialog.setFixedSize(400, 380)
     
     # Layout
     layout = QVBoxLayout(dialog)
@@ -336,6 +359,11 @@ def configurar_email(parent_window):
     porta_edit.setText(str(CONFIG_EMAIL['smtp_port']))
     layout.addWidget(porta_edit)
     
+    # Formato do corpo
+    html_check = QCheckBox("Enviar as tarefas em tabela HTML")
+    html_check.setChecked(CONFIG_EMAIL.get('formato_corpo') == 'html')
+    layout.addWidget(html_check)
+    
     # Botões
     button_layout = QVBoxLayout()
     
@@ -347,7 +375,8 @@ CONFIG_EMAIL = {{
     'email': '{email_edit.text()}',
     'senha': '{senha_edit.text()}',
     'smtp_server': '{smtp_edit.text()}',
-    'smtp_port': {porta_edit.text()}
+    'smtp_port': {porta_edit.text()},
+    'formato_corpo': '{'html' if html_check.isChecked() else 'texto'}'
 }}
 '''
             with open('EMAIL/config.py', 'w', encoding='utf-8') as f:
@@ -1,14 +1,16 @@
-from PySide6.QtWidgets import (QWidget, QVBoxLayout, QPushButton, QLabel)
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QPushButton, QLabel, QProgressBar, QMessageBox)
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
-from EMAIL.functions import enviar_email_seed, visualizar_responsaveis, configurar_email
+from EMAIL.functions import (EmailWorker, enviar_email_seed, mostrar_resultado_envio,
+                             visualizar_responsaveis, configurar_email)
 
 class EmailToolsWindow(QWidget):
     def __init__(self, main_window):
         super().__init__()
         self.main_window = main_window
         self.setWindowTitle("Automação de envio de e-mail")
-        self.setFixedSize(450, 400)
+        self.setFixedSize(450, 520)
+        self.worker = None
         
         # Layout principal
         layout = QVBoxLayout(self)
@@ -34,10 +36,10 @@ class EmailToolsWindow(QWidget):
         layout.addSpacing(20)
         
         # Botão Envio de e-mail por Categoria
-        email_seed_button = QPushButton("Envio de e-mail por Categoria")
-        email_seed_button.setFixedHeight(40)
-        email_seed_button.clicked.connect(self.enviar_email_seed_action)
-        layout.addWidget(email_seed_button)
+        self.email_seed_button = QPushButton("Envio de e-mail por Categoria")
+        self.email_seed_button.setFixedHeight(40)
+        self.email_seed_button.clicked.connect(self.enviar_email_seed_action)
+        layout.addWidget(self.email_seed_button)
         
         # Botão Configurar E-mail
         config_button = QPushButton("⚙️ Configurar E-mail")
@@ -51,6 +53,25 @@ class EmailToolsWindow(QWidget):
         visualizar_button.clicked.connect(self.visualizar_responsaveis_action)
         layout.addWidget(visualizar_button)
         
+        # Progresso do envio em andamento
+        self.status_label = QLabel("")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.status_label.setStyleSheet("color: gray;")
+        layout.addWidget(self.status_label)
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        layout.addWidget(self.progress_bar)
+        
+        self.contagem_label = QLabel("")
+        self.contagem_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.contagem_label)
+        
+        self.cancel_button = QPushButton("⏹️ Cancelar envio")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancelar_envio)
+        layout.addWidget(self.cancel_button)
+        
         # Espaçamento
         layout.addStretch()
         
@@ -62,7 +83,73 @@ class EmailToolsWindow(QWidget):
     
     def enviar_email_seed_action(self):
         """Ação para o botão Envio de e-mail por Categoria"""
-        enviar_email_seed(self)
+        tarefa = enviar_email_seed(self)
+        if not tarefa:
+            return
+        
+        self.email_seed_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.progress_bar.setMaximum(0)  # Indeterminado até a primeira categoria
+        self.status_label.setText("Preparando envio...")
+        self.atualizar_contagem(0, 0, 0)
+        
+        self.worker = EmailWorker(tarefa)
+        self.worker.progress_signal.connect(self.atualizar_progresso)
+        self.worker.contagem_signal.connect(self.atualizar_contagem)
+        self.worker.finished_signal.connect(self.envio_concluido)
+        self.worker.error_signal.connect(self.envio_erro)
+        self.worker.start()
+    
+    def atualizar_progresso(self, concluidas, total, mensagem):
+        """Atualiza barra de progresso e status"""
+        if total > 0:
+            self.progress_bar.setMaximum(total)
+            self.progress_bar.setValue(min(concluidas, total))
+        
+        if mensagem:
+            self.status_label.setText(mensagem)
+    
+    def atualizar_contagem(self, enviados, falhas, sem_responsavel):
+        """Atualiza as contagens ao vivo"""
+        self.contagem_label.setText(
+            f"✅ Enviados: {enviados}   ❌ Falhas: {falhas}   ⚠️ Sem responsável: {sem_responsavel}"
+        )
+    
+    def envio_concluido(self, resultado):
+        """Processa conclusão do envio"""
+        self.restaurar_controles()
+        mostrar_resultado_envio(resultado, self)
+    
+    def envio_erro(self, mensagem):
+        """Processa erro no envio"""
+        self.restaurar_controles()
+        QMessageBox.critical(self, "Erro", mensagem)
+    
+    def cancelar_envio(self):
+        """Pede o cancelamento; as mensagens já em envio terminam"""
+        if self.worker and self.worker.isRunning():
+            self.worker.stop()
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText("Cancelando...")
+    
+    def restaurar_controles(self):
+        """Restaura controles para estado inicial"""
+        self.email_seed_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.progress_bar.setMaximum(100)
+        self.progress_bar.setValue(0)
+        self.status_label.setText("")
+    
+    def parar_worker(self):
+        """Cancela e espera o envio em andamento, se houver"""
+        if self.worker and self.worker.isRunning():
+            self.worker.stop()
+            self.worker.wait()
+    
+    def closeEvent(self, event):
+        """Trata o fechamento da janela"""
+        self.parar_worker()
+        event.accept()
     
     def visualizar_responsaveis_action(self):
         """Ação para o botão Visualizar Responsáveis"""
@@ -74,5 +161,6 @@ class EmailToolsWindow(QWidget):
     
     def voltar(self):
         """Volta para a janela principal"""
+        self.parar_worker()
         self.main_window.show()
         self.close()
@@ -0,0 +1,191 @@
+import time
+import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+
+# Tempo máximo de espera por resposta do servidor SMTP (segundos)
+TIMEOUT_SMTP = 30
+# Conexões simultâneas por servidor: provedores costumam recusar mais que isso
+MAX_CONEXOES_PADRAO = 3
+
+def montar_mensagem(remetente, destinatario, assunto, corpo, subtipo='plain'):
+    """Monta a mensagem MIME com o corpo em texto (ou HTML, com subtipo='html')"""
+    msg = MIMEMultipart()
+    msg['From'] = remetente
+    msg['To'] = destinatario
+    msg['Subject'] = assunto
+    msg.attach(MIMEText(corpo, subtipo))
+    return msg
+
+class SessaoSMTP:
+    """
+    Conexão SMTP reaproveitada entre vários envios.
+
+    Conecta (STARTTLS + login) só no primeiro envio e mantém a conexão aberta
+    até `fechar()`. Se o servidor derrubar a conexão (SMTPServerDisconnected),
+    reconecta e repete o envio uma vez. O login só é feito se houver senha e o
+    STARTTLS pode ser desligado com `usar_tls=False` (ex.: servidor local de teste).
+    """
+
+    def __init__(self, smtp_server, smtp_port, remetente, senha=None, usar_tls=True, timeout=TIMEOUT_SMTP):
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.remetente = remetente
+        self.senha = senha
+        self.usar_tls = usar_tls
+        self.timeout = timeout
+        self.conexoes = 0
+        self._server = None
+
+    @classmethod
+    def da_configuracao(cls, config):
+        """Cria a sessão a partir do dicionário de configuração (CONFIG_EMAIL)"""
+        return cls(config['smtp_server'], config['smtp_port'], config['email'],
+                   config.get('senha'), config.get('usar_tls', True))
+
+    def conectar(self):
+        """Abre a conexão, se ainda não estiver aberta"""
+        if self._server is not None:
+            return
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
+        try:
+            if self.usar_tls:
+                server.starttls()
+            if self.senha:
+                server.login(self.remetente, self.senha)
+        except Exception:
+            server.close()
+            raise
+        self._server = server
+        self.conexoes += 1
+
+    def enviar(self, destinatario, assunto, corpo, subtipo='plain'):
+        """Envia uma mensagem pela conexão aberta, reconectando se ela tiver caído"""
+        texto = montar_mensagem(self.remetente, destinatario, assunto, corpo, subtipo).as_string()
+        self.conectar()
+        try:
+            self._server.sendmail(self.remetente, destinatario, texto)
+        except smtplib.SMTPServerDisconnected:
+            self._descartar()
+            self.conectar()
+            self._server.sendmail(self.remetente, destinatario, texto)
+
+    def _descartar(self):
+        """Esquece a conexão atual sem conversar com o servidor"""
+        if self._server is not None:
+            try:
+                self._server.close()
+            finally:
+                self._server = None
+
+    def fechar(self):
+        """Encerra a conexão com QUIT (ignora se o servidor já tiver desconectado)"""
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        finally:
+            self._descartar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+class LimitadorMensagens:
+    """Espaça os envios para no máximo `por_minuto` mensagens por minuto, entre todas as threads"""
+
+    def __init__(self, por_minuto):
+        self.intervalo = 60.0 / por_minuto
+        self._proximo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def aguardar(self):
+        with self._lock:
+            agora = time.monotonic()
+            horario = max(agora, self._proximo)
+            self._proximo = horario + self.intervalo
+        if horario > agora:
+            time.sleep(horario - agora)
+
+class DisparadorEmails:
+    """
+    Envia mensagens em paralelo por um pool de conexões SMTP.
+
+    Cada thread do pool (no máximo `max_conexoes`, o limite por servidor)
+    mantém a própria SessaoSMTP aberta durante todo o disparo. Com
+    `mensagens_por_minuto`, os envios de todas as threads passam por um
+    LimitadorMensagens. No máximo 2 x `max_conexoes` mensagens ficam na fila,
+    então os corpos podem ser gerados sob demanda.
+    """
+
+    def __init__(self, config, max_conexoes=MAX_CONEXOES_PADRAO, mensagens_por_minuto=None):
+        self.config = config
+        self.max_conexoes = max_conexoes
+        self.limitador = LimitadorMensagens(mensagens_por_minuto) if mensagens_por_minuto else None
+        self._local = threading.local()
+        self._sessoes = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def da_configuracao(cls, config):
+        """Cria o disparador a partir do dicionário de configuração (CONFIG_EMAIL)"""
+        return cls(config, config.get('max_conexoes', MAX_CONEXOES_PADRAO), config.get('mensagens_por_minuto'))
+
+    def _sessao(self):
+        sessao = getattr(self._local, 'sessao', None)
+        if sessao is None:
+            sessao = self._local.sessao = SessaoSMTP.da_configuracao(self.config)
+            with self._lock:
+                self._sessoes.append(sessao)
+        return sessao
+
+    def _enviar(self, chave, destinatario, assunto, corpo, subtipo, ao_concluir, deve_parar):
+        try:
+            if self.limitador:
+                self.limitador.aguardar()
+            # Cancelado enquanto a mensagem esperava na fila: descarta sem enviar
+            if deve_parar and deve_parar():
+                return
+            self._sessao().enviar(destinatario, assunto, corpo, subtipo)
+            erro = None
+        except Exception as e:
+            erro = e
+        if ao_concluir:
+            ao_concluir(chave, erro)
+
+    def enviar_todas(self, mensagens, ao_concluir=None, deve_parar=None):
+        """
+        Envia as mensagens `(chave, destinatario, assunto, corpo[, subtipo])` e espera todas terminarem.
+
+        `ao_concluir(chave, erro)` é chamado das threads do pool após cada envio,
+        com `erro=None` em caso de sucesso. Com `deve_parar()` verdadeiro,
+        nenhuma mensagem nova é enviada: as que ainda estão na fila são
+        descartadas sem chamar `ao_concluir`; as já em envio terminam.
+        """
+        vagas = threading.BoundedSemaphore(self.max_conexoes * 2)
+
+        def enviar_e_liberar(*args):
+            try:
+                self._enviar(*args)
+            finally:
+                vagas.release()
+
+        pool = ThreadPoolExecutor(max_workers=self.max_conexoes, thread_name_prefix="smtp")
+        try:
+            for chave, destinatario, assunto, corpo, *subtipo in mensagens:
+                if deve_parar and deve_parar():
+                    break
+                vagas.acquire()
+                pool.submit(enviar_e_liberar, chave, destinatario, assunto, corpo,
+                            subtipo[0] if subtipo else 'plain', ao_concluir, deve_parar)
+        finally:
+            pool.shutdown(wait=True)
+            for sessao in self._sessoes:
+                sessao.fechar()
+            self._sessoes = []
@@ -0,0 +1,94 @@
+import html
+
+import numpy as np
+
+def iterar_categorias(df, coluna='Categoria'):
+    """
+    Gera `(categoria, tarefas_da_categoria)` em uma única passada pelo DataFrame.
+
+    Usa um único groupby em vez de filtrar o DataFrame inteiro para cada
+    categoria. As categorias saem na ordem em que aparecem no arquivo, cada
+    grupo mantém o índice original, e tarefas sem categoria (NaN) formam um
+    grupo próprio.
+    """
+    for categoria, tarefas in df.groupby(coluna, sort=False, dropna=False):
+        yield categoria, tarefas
+
+VALOR_VAZIO = "Não informado"
+
+def _valores_formatados(serie):
+    """Converte a coluna em texto, trocando NaN e vazios por VALOR_VAZIO (sem laço por célula)"""
+    textos = serie.astype(str)
+    valores = textos.to_numpy(dtype=object)
+    valores[serie.isna().to_numpy() | (textos == "").to_numpy(dtype=bool, na_value=False)] = VALOR_VAZIO
+    return valores
+
+def _colunas_do_corpo(tarefas_df):
+    # Todas as colunas, exceto a própria Categoria
+    return [col for col in tarefas_df.columns if col != 'Categoria']
+
+def _juntar_linhas(partes, linhas):
+    """
+    Junta as partes de cada linha (textos fixos ou arrays com um valor por linha)
+    e todas as linhas num único texto, com um só join no fim.
+    """
+    colunas = [parte if isinstance(parte, np.ndarray) else np.full(linhas, parte, dtype=object)
+               for parte in partes]
+    if not linhas:
+        return ""
+    return "".join(np.column_stack(colunas).ravel().tolist())
+
+def criar_corpo_email_completo(categoria, tarefas_df):
+    """
+    Cria o corpo do e-mail com TODAS as colunas do DataFrame
+
+    Cada coluna é formatada de uma vez como array; o texto das tarefas é
+    montado com um único join, sem iterrows nem concatenação repetida.
+    """
+    colunas = _colunas_do_corpo(tarefas_df)
+    numeros = (tarefas_df.index + 1).astype(str).to_numpy(dtype=object)
+
+    # Por tarefa: cabeçalho, uma linha por coluna e uma linha em branco
+    partes = ["📋 Tarefa ", numeros, ":\n"]
+    for coluna in colunas:
+        partes += [f"   • {coluna}: ", _valores_formatados(tarefas_df[coluna]), "\n"]
+    partes.append("\n")
+
+    return (
+        f"""Prezado Responsável pela Categoria {categoria},
+
+Segue a lista detalhada de tarefas para sua área:
+
+"""
+        + _juntar_linhas(partes, len(tarefas_df))
+        + f"""
+Total de tarefas: {len(tarefas_df)}
+
+Atenciosamente,
+Sistema de Automação
+"""
+    )
+
+def criar_corpo_email_html(categoria, tarefas_df):
+    """Cria o corpo do e-mail em HTML, com as tarefas numa tabela (uma coluna por campo)"""
+    colunas = _colunas_do_corpo(tarefas_df)
+    numeros = (tarefas_df.index + 1).astype(str).to_numpy(dtype=object)
+
+    partes = ["<tr><td>", numeros, "</td>"]
+    for coluna in colunas:
+        valores = np.array([html.escape(valor) for valor in _valores_formatados(tarefas_df[coluna])], dtype=object)
+        partes += ["<td>", valores, "</td>"]
+    partes.append("</tr>\n")
+
+    cabecalho = "".join(f"<th>{html.escape(str(coluna))}</th>" for coluna in colunas)
+    categoria = html.escape(str(categoria))
+    return (
+        f"<p>Prezado Responsável pela Categoria {categoria},</p>\n"
+        "<p>Segue a lista detalhada de tarefas para sua área:</p>\n"
+        '<table border="1" cellpadding="4" cellspacing="0" style="border-collapse: collapse;">\n'
+        f"<tr><th>#</th>{cabecalho}</tr>\n"
+        + _juntar_linhas(partes, len(tarefas_df))
+        + "</table>\n"
+        f"<p>Total de tarefas: {len(tarefas_df)}</p>\n"
+        "<p>Atenciosamente,<br>Sistema de Automação</p>\n"
+    )
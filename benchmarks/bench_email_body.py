@@ -0,0 +1,85 @@
+"""
+Benchmark da montagem do corpo do e-mail (EMAIL.tarefas).
+
+Uso:
+    python benchmarks/bench_email_body.py [tarefas]
+
+Gera uma categoria sintética com `tarefas` tarefas (padrão: 20.000) e 6
+colunas com valores vazios, e compara a montagem anterior (iterrows, pd.isna
+por célula e `+=` na string) com a montagem por colunas e com a tabela HTML.
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from EMAIL.tarefas import criar_corpo_email_completo, criar_corpo_email_html  # noqa: E402
+
+def gerar_categoria(tarefas):
+    """Tarefas de uma categoria, com ~10% de células vazias."""
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({
+        "Categoria": "Eletroportáteis",
+        "Tarefa": np.char.add("Revisar produto ", np.arange(tarefas).astype(str)),
+        "SKU": rng.integers(10_000_000, 99_999_999, tarefas).astype(str),
+        "Título": np.char.add("Liquidificador modelo ", rng.integers(0, 999, tarefas).astype(str)),
+        "Prioridade": rng.choice(np.array(["Alta", "Média", "Baixa"], dtype=object), tarefas),
+        "Responsável": "Equipe de catálogo",
+        "Observação": rng.choice(np.array(["Foto faltando", "Descrição curta", ""], dtype=object), tarefas),
+    })
+    vazios = rng.random(df.shape) < 0.1
+    vazios[:, 0] = False
+    return df.mask(vazios)
+
+def corpo_original(categoria, tarefas_df):
+    """Implementação anterior: iterrows e concatenação com +=."""
+    colunas = [col for col in tarefas_df.columns if col != 'Categoria']
+    corpo = f"""Prezado Responsável pela Categoria {categoria},
+
+Segue a lista detalhada de tarefas para sua área:
+
+"""
+    for index, row in tarefas_df.iterrows():
+        corpo += f"📋 Tarefa {index + 1}:\n"
+        for coluna in colunas:
+            valor = row[coluna]
+            if pd.isna(valor) or valor == "":
+                valor = "Não informado"
+            corpo += f"   • {coluna}: {valor}\n"
+        corpo += "\n"
+    corpo += f"""
+Total de tarefas: {len(tarefas_df)}
+
+Atenciosamente,
+Sistema de Automação
+"""
+    return corpo
+
+def medir(func, df, repeticoes=3):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func("Eletroportáteis", df)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+def main():
+    tarefas = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    df = gerar_categoria(tarefas)
+    print(f"{tarefas} tarefas, {len(df.columns) - 1} colunas no corpo\n")
+
+    assert corpo_original("Eletroportáteis", df) == criar_corpo_email_completo("Eletroportáteis", df)
+
+    base = None
+    for nome, func in [("iterrows + += (anterior)", corpo_original),
+                       ("por colunas (texto)", criar_corpo_email_completo),
+                       ("por colunas (tabela HTML)", criar_corpo_email_html)]:
+        tempo = medir(func, df)
+        base = base or tempo
+        print(f"{nome:28s} {tempo * 1000:9.1f} ms  ({base / tempo:5.1f}x)")
+
+if __name__ == "__main__":
+    main()
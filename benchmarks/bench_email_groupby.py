@@ -0,0 +1,62 @@
+"""
+Benchmark da separação das tarefas por categoria (EMAIL.tarefas.iterar_categorias).
+
+Uso:
+    python benchmarks/bench_email_groupby.py [tarefas] [categorias]
+
+Gera um DataFrame sintético (padrão: 1.000.000 tarefas em 500 categorias) e
+compara o filtro por categoria usado antes (`df[df['Categoria'] == c]` para
+cada categoria, O(categorias x linhas)) com a passada única do groupby.
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from EMAIL.tarefas import iterar_categorias  # noqa: E402
+
+def gerar_tarefas(tarefas, categorias):
+    """DataFrame com as colunas da planilha de categorias, em ordem embaralhada."""
+    rng = np.random.default_rng(42)
+    nomes = np.array([f"Categoria {i:03d}" for i in range(categorias)], dtype=object)
+    return pd.DataFrame({
+        "Categoria": nomes[rng.integers(0, categorias, tarefas)],
+        "Tarefa": np.char.add("Revisar produto ", np.arange(tarefas).astype(str)),
+        "SKU": rng.integers(10_000_000, 99_999_999, tarefas).astype(str),
+        "Prioridade": rng.choice(np.array(["Alta", "Média", "Baixa", None], dtype=object), tarefas),
+    })
+
+def separacao_original(df):
+    """Implementação anterior: um filtro sobre o DataFrame inteiro por categoria."""
+    for categoria in df['Categoria'].unique():
+        yield categoria, df[df['Categoria'] == categoria]
+
+def medir(func, df):
+    inicio = time.perf_counter()
+    grupos = sum(len(tarefas) for _, tarefas in func(df))
+    return time.perf_counter() - inicio, grupos
+
+def main():
+    tarefas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    categorias = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    df = gerar_tarefas(tarefas, categorias)
+    print(f"{tarefas} tarefas, {categorias} categorias\n")
+
+    original = [(c, t.index.tolist()) for c, t in separacao_original(df.head(50_000))]
+    novo = [(c, t.index.tolist()) for c, t in iterar_categorias(df.head(50_000))]
+    assert original == novo, "grupos diferentes"
+
+    base = None
+    for nome, func in [("filtro por categoria", separacao_original),
+                       ("groupby (iterar_categorias)", iterar_categorias)]:
+        tempo, linhas = medir(func, df)
+        assert linhas == tarefas
+        base = base or tempo
+        print(f"{nome:30s} {tempo:8.2f} s  ({base / tempo:5.1f}x)")
+
+if __name__ == "__main__":
+    main()
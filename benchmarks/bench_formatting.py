@@ -0,0 +1,96 @@
+"""
+Benchmark da formatação de CSV (CSV.formatting).
+
+Uso:
+    python benchmarks/bench_formatting.py [linhas] [arquivo.csv]
+
+Sem arquivo, gera um CSV sintético com `linhas` registros (padrão: 1.000.000)
+e colunas extras, como as exportações do backoffice. Mede a construção de
+`link_backoffice` (laço Python x concatenação vetorizada) e a formatação
+completa em streaming, em linhas por segundo.
+"""
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from CSV.formatting import (COLUNAS_PARA_MANTER, LINK_BACKOFFICE, formatar_arquivo,  # noqa: E402
+                            formatar_dataframe, ler_colunas_formatacao)
+
+def gerar_fixture(caminho, linhas, colunas_extras=12):
+    """Grava um CSV sintético com as colunas formatadas e `colunas_extras` colunas descartadas."""
+    ids = np.arange(10_000_000, 10_000_000 + linhas).astype(str)
+    dados = {coluna: np.full(linhas, f"valor {coluna}") for coluna in COLUNAS_PARA_MANTER}
+    dados["navigation_id"] = ids
+    dados["descrição"] = np.char.add("Descrição do produto ", ids)
+    for i in range(colunas_extras):
+        dados[f"extra_{i}"] = np.char.add(f"x{i}-", ids)
+    pd.DataFrame(dados).to_csv(caminho, index=False)
+
+def link_original(df):
+    """Implementação anterior: list comprehension sobre navigation_id."""
+    return [f'{LINK_BACKOFFICE}{n}/edit' for n in df['navigation_id']]
+
+def formatacao_original(df):
+    """Implementação anterior completa: cópia, list comprehension e fillna."""
+    df_filtrado = df[COLUNAS_PARA_MANTER].copy()
+    df_filtrado['link_backoffice'] = link_original(df_filtrado)
+    return df_filtrado.fillna("")
+
+def link_vetorizado(df):
+    """Só o trecho de `formatar_dataframe` que monta o link."""
+    return LINK_BACKOFFICE + df['navigation_id'].astype(str).to_numpy(dtype=object) + '/edit'
+
+def medir(func, repeticoes=3):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    with tempfile.TemporaryDirectory() as pasta:
+        if len(sys.argv) > 2:
+            caminho = sys.argv[2]
+        else:
+            caminho = os.path.join(pasta, "fixture.csv")
+            print(f"Gerando {linhas} linhas...")
+            gerar_fixture(caminho, linhas)
+
+        tamanho_mb = os.path.getsize(caminho) / (1024 * 1024)
+        df = ler_colunas_formatacao(caminho)
+        linhas = len(df)
+        print(f"{linhas} linhas, {tamanho_mb:.0f} MB\n")
+
+        esperado = link_original(df)
+        assert formatar_dataframe(df)['link_backoffice'].tolist() == esperado, "links diferentes"
+
+        comparacoes = [
+            ("link_backoffice", [("list comprehension", lambda: link_original(df)),
+                                 ("concatenação vetorizada", lambda: link_vetorizado(df))]),
+            ("DataFrame formatado", [("implementação anterior", lambda: formatacao_original(df)),
+                                     ("formatar_dataframe", lambda: formatar_dataframe(df))]),
+        ]
+        for titulo, candidatos in comparacoes:
+            print(titulo)
+            base = None
+            for nome, func in candidatos:
+                tempo = medir(func)
+                base = base or tempo
+                print(f"  {nome:34s} {linhas / tempo:14,.0f} linhas/s  ({base / tempo:4.1f}x)")
+
+        print("\nArquivo completo (leitura + formatação + escrita)")
+        destino = os.path.join(pasta, "formatado.csv")
+        tempo = medir(lambda: formatar_arquivo(caminho, destino), repeticoes=1)
+        print(f"  {'formatar_arquivo (em blocos)':34s} {linhas / tempo:14,.0f} linhas/s  ({tempo:.2f} s)")
+
+if __name__ == "__main__":
+    main()
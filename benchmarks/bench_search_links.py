@@ -0,0 +1,68 @@
+"""
+Benchmark da extração de links de produto (scraping.extract_product_links).
+
+Uso:
+    python benchmarks/bench_search_links.py [pagina1.html pagina2.html ...]
+
+Sem argumentos, gera uma página de busca sintética parecida com a da Magalu
+(~60 produtos em meio a milhares de nós de layout). Para medir com páginas
+reais, salve buscas com o navegador e passe os arquivos .html.
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup  # noqa: E402
+from scraping import extract_product_links, lxml_html  # noqa: E402
+
+def pagina_sintetica(produtos=60, nos_por_produto=80):
+    """Monta uma página de busca com muitos nós que não são links de produto."""
+    partes = ["<html><head><title>Busca</title></head><body><div id='app'>"]
+    for i in range(produtos):
+        partes.append("<div class='card'>")
+        for j in range(nos_por_produto):
+            partes.append(f"<span class='c{j}' data-x='{i}-{j}'>texto {j}</span>")
+        partes.append(f"<a href='/produto-{i}/p/{i:08x}ab/te/mont/'>Produto {i}</a>")
+        partes.append(f"<a href='/categoria/{i}/'>Categoria</a></div>")
+    partes.append("</div></body></html>")
+    return "".join(partes).encode("utf-8")
+
+def extracao_original(html):
+    """Implementação anterior: árvore completa com html.parser."""
+    soup = BeautifulSoup(html, 'html.parser')
+    return list({a['href'] for a in soup.find_all('a', href=True) if '/p/' in a['href']})
+
+def medir(func, paginas, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for html in paginas:
+            func(html)
+    return (time.perf_counter() - inicio) / (repeticoes * len(paginas))
+
+def main():
+    if len(sys.argv) > 1:
+        paginas = [Path(caminho).read_bytes() for caminho in sys.argv[1:]]
+    else:
+        paginas = [pagina_sintetica()]
+
+    repeticoes = 20
+    esperado = sorted(extracao_original(paginas[0]))
+
+    candidatos = [("html.parser (árvore completa)", extracao_original)]
+    candidatos.append(("html.parser + SoupStrainer", lambda h: extract_product_links(h, parser="html.parser")))
+    if lxml_html is not None:
+        candidatos.append(("lxml + XPath", lambda h: extract_product_links(h, parser="lxml")))
+
+    base = None
+    tamanho_kb = sum(len(p) for p in paginas) / len(paginas) / 1024
+    print(f"{len(paginas)} página(s), {tamanho_kb:.0f} KB em média, {repeticoes} repetições\n")
+    for nome, func in candidatos:
+        assert sorted(func(paginas[0])) == esperado, f"{nome} extraiu links diferentes"
+        tempo = medir(func, paginas, repeticoes)
+        base = base or tempo
+        print(f"{nome:32s} {tempo * 1000:8.2f} ms/página  ({base / tempo:4.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# --- Constantes ---
+DEFAULT_CACHE_DIR = Path(".cache") / "http"
+DEFAULT_TTL = 6 * 60 * 60  # 6 horas
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+
+# Cabeçalhos que não descrevem o corpo já decodificado que fica salvo em disco
+_SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """Resposta armazenada no cache."""
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes
+    stored_at: float
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """Cabeçalhos condicionais para revalidar a entrada no servidor."""
+        headers = CaseInsensitiveDict(self.headers)
+        validators = {}
+        if "ETag" in headers:
+            validators["If-None-Match"] = headers["ETag"]
+        if "Last-Modified" in headers:
+            validators["If-Modified-Since"] = headers["Last-Modified"]
+        return validators
+
+class ResponseCache:
+    """
+    Cache HTTP persistente em disco com TTL, revalidação e limite de tamanho.
+
+    Os corpos ficam em arquivos (um por URL) e os metadados num índice SQLite,
+    que também guarda o último acesso de cada entrada para o despejo LRU.
+    """
+
+    def __init__(self, directory: Union[str, Path] = DEFAULT_CACHE_DIR,
+                 ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.directory / "index.sqlite3"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, url TEXT NOT NULL, status INTEGER NOT NULL,"
+            " headers TEXT NOT NULL, size INTEGER NOT NULL,"
+            " stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self._db.commit()
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _body_path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return time.time() - entry.stored_at < self.ttl
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Retorna a entrada da URL (fresca ou não) e marca o acesso para o LRU."""
+        key = self._key(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, stored_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+
+        try:
+            body = self._body_path(key).read_bytes()
+        except OSError:
+            # Índice aponta para um arquivo que sumiu: descarta a entrada
+            self.delete(url)
+            return None
+
+        status, headers, stored_at = row
+        return CachedResponse(url=url, status_code=status, headers=json.loads(headers),
+                              body=body, stored_at=stored_at)
+
+    def put(self, url: str, status_code: int, headers: Dict[str, str], body: bytes) -> None:
+        """Grava (ou substitui) a resposta da URL e aplica o limite de tamanho."""
+        if len(body) > self.max_bytes:
+            return
+
+        key = self._key(url)
+        path = self._body_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{key}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(body)
+        os.replace(tmp_path, path)
+
+        stored_headers = {k: v for k, v in headers.items() if k.lower() not in _SKIPPED_HEADERS}
+        now = time.time()
+        with self._lock:
+            previous = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, url, status, headers, size, stored_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status_code, json.dumps(stored_headers), len(body), now, now),
+            )
+            self._total_bytes += len(body) - (previous[0] if previous else 0)
+            self._evict_locked()
+            self._db.commit()
+
+    def refresh(self, url: str, headers: Dict[str, str]) -> None:
+        """Renova o TTL após um 304, atualizando os validadores enviados pelo servidor."""
+        key = self._key(url)
+        with self._lock:
+            row = self._db.execute("SELECT headers FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            stored_headers = CaseInsensitiveDict(json.loads(row[0]))
+            for name in ("ETag", "Last-Modified", "Cache-Control", "Expires"):
+                if name in headers:
+                    stored_headers[name] = headers[name]
+            now = time.time()
+            self._db.execute(
+                "UPDATE entries SET headers = ?, stored_at = ?, accessed_at = ? WHERE key = ?",
+                (json.dumps(dict(stored_headers)), now, now, key),
+            )
+            self._db.commit()
+
+    def delete(self, url: str) -> None:
+        key = self._key(url)
+        with self._lock:
+            self._delete_locked(key)
+            self._db.commit()
+
+    def clear(self) -> None:
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            for (key,) in self._db.execute("SELECT key FROM entries").fetchall():
+                self._delete_locked(key)
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _delete_locked(self, key: str) -> None:
+        row = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return
+        self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._total_bytes -= row[0]
+        try:
+            self._body_path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _evict_locked(self) -> None:
+        """Remove as entradas acessadas há mais tempo até caber em `max_bytes`."""
+        while self._total_bytes > self.max_bytes:
+            row = self._db.execute(
+                "SELECT key FROM entries ORDER BY accessed_at ASC LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._delete_locked(row[0])
+
+class CachingAdapter(HTTPAdapter):
+    """
+    HTTPAdapter que responde GETs a partir de um `ResponseCache`.
+
+    Entradas dentro do TTL não tocam a rede; entradas vencidas são revalidadas
+    com ETag/Last-Modified e um 304 reaproveita o corpo salvo.
+    """
+
+    def __init__(self, cache: Optional[ResponseCache] = None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        # Respostas em stream não são lidas aqui para não baixar corpos que o chamador descarta
+        if self.cache is None or request.method != "GET" or kwargs.get("stream"):
+            return self.send_network(request, **kwargs)
+
+        entry = self.cache.get(request.url)
+        if entry is not None and self.cache.is_fresh(entry):
+            return self._build_response(request, entry)
+
+        if entry is not None:
+            for name, value in entry.validators.items():
+                request.headers.setdefault(name, value)
+
+        response = self.send_network(request, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.refresh(request.url, response.headers)
+            response.close()
+            return self._build_response(request, entry)
+
+        if response.status_code == 200 and "no-store" not in response.headers.get("Cache-Control", ""):
+            self.cache.put(request.url, response.status_code, dict(response.headers), response.content)
+
+        return response
+
+    def send_network(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        """Envia a requisição pela rede (ponto de extensão para subclasses)."""
+        return super().send(request, **kwargs)
+
+    def _build_response(self, request: requests.PreparedRequest, entry: CachedResponse) -> requests.Response:
+        response = requests.Response()
+        response.status_code = entry.status_code
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response._content = entry.body
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.reason = "OK"
+        response.request = request
+        response.connection = self
+        response.from_cache = True
+        return response
@@ -1,20 +1,30 @@
 import time
 import re
-from typing import List, Optional, Generator
+import json
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Generator, Set, Tuple, TypeVar
 from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import csv
+import sys
+import argparse
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
 
 import requests
-from bs4 import BeautifulSoup
-from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
 from urllib3.util.retry import Retry
 
-from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
-                              QLineEdit, QPushButton, QSpinBox, QTextEdit,
-                              QProgressBar, QMessageBox)
-from PySide6.QtCore import Qt, QThread, Signal
+from http_cache import CachingAdapter, ResponseCache
+
+try:
+    import lxml.html as lxml_html
+except ImportError:  # lxml é opcional: sem ele usamos o html.parser
+    lxml_html = None
 
 # --- Constantes ---
 BASE_URL = "https://www.magazineluiza.com.br"
@@ -24,317 +34,932 @@ USER_AGENT = (
     "Chrome/115.0.0.0 Safari/537.36"
 )
 ID_PATTERN = re.compile(r'/p/([a-zA-Z0-9]+)/')
+CACHE_DIR = Path(".cache") / "magalu"
+JOURNAL_DIR = Path("CSV") / ".jobs"
+DEFAULT_MAX_WORKERS = 8  # Requisições simultâneas
+DEFAULT_RATE_PER_HOST = 4.0  # Requisições por segundo por host (taxa inicial)
+MIN_RATE_PER_HOST = 0.2
+MAX_RATE_PER_HOST = 16.0
+THROTTLE_STATUSES = (429, 503)
+THROTTLE_RETRIES = 3
+MAX_RETRY_AFTER = 60.0  # Teto (s) para o Retry-After: valores maiores são limitados a ele
+
+LINK_PARSER = "lxml" if lxml_html is not None else "html.parser"
+_ONLY_LINKS = SoupStrainer("a", href=True)
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 @dataclass(frozen=True)
 class ProductRecord:
     """Modelo de dados imutável para exportação."""
     product_id: str
 
-class ScrapingWorker(QThread):
-    """Thread para execução do scraping em background"""
-    progress_signal = Signal(int, int, str)  # (atual, total, mensagem)
-    finished_signal = Signal(str)  # mensagem final
-    error_signal = Signal(str)  # mensagem de erro
-    
-    def __init__(self, termo_busca: str, max_paginas: int):
-        super().__init__()
+def extract_product_links(html: bytes, parser: str = LINK_PARSER) -> List[str]:
+    """
+    Extrai os hrefs de produto (contendo /p/) de uma página de busca, sem duplicados.
+    
+    Com lxml a seleção é feita por XPath direto na árvore C; no fallback o
+    BeautifulSoup só materializa as tags <a href> (SoupStrainer).
+    """
+    if parser == "lxml":
+        try:
+            document = lxml_html.fromstring(html)
+        except lxml_html.etree.ParserError:  # Corpo vazio ou só comentários/espaços
+            return []
+        # Strings simples: as "smart strings" do lxml mantêm a árvore da página inteira viva
+        hrefs = document.xpath("//a[contains(@href, '/p/')]/@href", smart_strings=False)
+    else:
+        soup = BeautifulSoup(html, 'html.parser', parse_only=_ONLY_LINKS)
+        hrefs = [a['href'] for a in soup.find_all('a') if '/p/' in a['href']]
+    return list(dict.fromkeys(hrefs))
+
+class RateLimiterClosed(requests.exceptions.RequestException):
+    """A requisição foi abortada porque o scraper foi cancelado ou encerrado."""
+
+@dataclass
+class _HostBudget:
+    """Estado do token bucket de um host."""
+    rate: float
+    tokens: float = 1.0
+    updated_at: float = 0.0  # Fica no futuro enquanto o host está bloqueado por Retry-After
+    blocks: int = 0  # Bloqueios já aplicados: reservas anteriores ao último são refeitas
+    fast_latency: Optional[float] = None
+    slow_latency: Optional[float] = None
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket por host com taxa adaptativa (AIMD), compartilhado por todas as requisições.
+    
+    Respostas saudáveis aumentam a taxa aos poucos (+`increase_step` req/s a cada
+    segundo de sucesso); 429/503, falhas de conexão ou latência em alta (média
+    rápida acima de `latency_ratio` x média lenta) cortam a taxa pela metade.
+    `Retry-After` bloqueia o host até o horário indicado (no máximo
+    `MAX_RETRY_AFTER`); as reservas feitas antes do bloqueio são refeitas a
+    partir do fim dele, espaçadas pela taxa, em vez de saírem todas juntas.
+    Após `close()` as esperas são interrompidas e `acquire` levanta
+    `RateLimiterClosed`.
+    """
+    
+    def __init__(self, rate_per_host: float = DEFAULT_RATE_PER_HOST,
+                 min_rate: float = MIN_RATE_PER_HOST, max_rate: float = MAX_RATE_PER_HOST,
+                 burst: float = 1.0, increase_step: float = 0.5, latency_ratio: float = 1.5) -> None:
+        self.initial_rate = rate_per_host
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, rate_per_host)
+        self.burst = burst
+        self.increase_step = increase_step
+        self.latency_ratio = latency_ratio
+        self._hosts: Dict[str, _HostBudget] = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+    
+    def _budget(self, host: str, now: float) -> _HostBudget:
+        budget = self._hosts.get(host)
+        if budget is None:
+            budget = self._hosts[host] = _HostBudget(rate=self.initial_rate, tokens=self.burst, updated_at=now)
+        return budget
+    
+    def rate(self, url: str) -> float:
+        """Taxa atual (req/s) do host da URL."""
+        with self._lock:
+            return self._budget(urlsplit(url).netloc, time.monotonic()).rate
+    
+    def acquire(self, url: str) -> float:
+        """Reserva um token do host, bloqueia até ele estar disponível e retorna o tempo esperado."""
+        host = urlsplit(url).netloc
+        waited = 0.0
+        with self._lock:
+            budget = self._budget(host, time.monotonic())
+            blocks = budget.blocks
+            ready_at = self._reserve(budget, time.monotonic())
+        while True:
+            wait = ready_at - time.monotonic()
+            if self._closed.is_set() or (wait > 0 and self._closed.wait(wait)):
+                raise RateLimiterClosed("Limitador encerrado")
+            waited += max(wait, 0.0)
+            with self._lock:
+                if budget.blocks == blocks:
+                    return waited
+                # Host bloqueado durante a espera: a reserva vai para depois do bloqueio
+                blocks = budget.blocks
+                ready_at = self._reserve(budget, time.monotonic())
+    
+    def _reserve(self, budget: _HostBudget, now: float) -> float:
+        """Consome um token e retorna o instante em que ele fica disponível."""
+        if now > budget.updated_at:
+            budget.tokens = min(self.burst, budget.tokens + (now - budget.updated_at) * budget.rate)
+            budget.updated_at = now
+        budget.tokens -= 1.0  # Tokens negativos são reservas de quem já está na fila
+        return budget.updated_at + max(0.0, -budget.tokens / budget.rate)
+    
+    def close(self) -> None:
+        """Interrompe as esperas em andamento; novos `acquire` levantam RateLimiterClosed."""
+        self._closed.set()
+    
+    def record(self, url: str, status_code: int, latency: float, retry_after: Optional[str] = None) -> None:
+        """Ajusta a taxa do host a partir do resultado de uma requisição."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            budget = self._budget(host, now)
+            
+            if status_code in THROTTLE_STATUSES:
+                self._decrease(budget)
+                delay = parse_retry_after(retry_after)
+                if delay and now + delay > budget.updated_at:
+                    # O bucket recomeça no fim do bloqueio com um token
+                    budget.updated_at = now + delay
+                    budget.tokens = 1.0
+                    budget.blocks += 1
+                return
+            
+            if status_code >= 500:
+                return
+            
+            budget.fast_latency = latency if budget.fast_latency is None else 0.3 * latency + 0.7 * budget.fast_latency
+            budget.slow_latency = latency if budget.slow_latency is None else 0.05 * latency + 0.95 * budget.slow_latency
+            if budget.fast_latency > self.latency_ratio * budget.slow_latency:
+                self._decrease(budget)
+                # Recomeça a tendência a partir do novo patamar
+                budget.slow_latency = budget.fast_latency
+            else:
+                budget.rate = min(self.max_rate, budget.rate + self.increase_step / budget.rate)
+    
+    def record_failure(self, url: str) -> None:
+        """Timeout ou conexão recusada: trata como sinal de sobrecarga."""
+        with self._lock:
+            self._decrease(self._budget(urlsplit(url).netloc, time.monotonic()))
+    
+    def _decrease(self, budget: _HostBudget) -> None:
+        budget.rate = max(self.min_rate, budget.rate / 2)
+
+def parse_retry_after(value: Optional[str], limit: float = MAX_RETRY_AFTER) -> Optional[float]:
+    """Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos de espera, até `limit`."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(float(value), limit)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return min(max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds()), limit)
+
+class ScraperMetrics:
+    """Contadores e tempos de um job de scraping (thread-safe)."""
+    
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.requests = 0
+        self.failures = 0
+        self.status_codes: Counter = Counter()
+        self.bytes_received = 0
+        self.latencies: List[float] = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.parse_times: List[float] = []
+        self.sleep_time = 0.0
+        self.stages: Dict[str, float] = {}
+    
+    def record_request(self, status_code: int, latency: float, nbytes: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.status_codes[status_code] += 1
+            self.latencies.append(latency)
+            self.bytes_received += nbytes
+    
+    def record_failure(self, latency: float) -> None:
+        with self._lock:
+            self.requests += 1
+            self.failures += 1
+            self.latencies.append(latency)
+    
+    def record_cache(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+    
+    def record_parse(self, seconds: float) -> None:
+        with self._lock:
+            self.parse_times.append(seconds)
+    
+    def record_sleep(self, seconds: float) -> None:
+        with self._lock:
+            self.sleep_time += seconds
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Mede o tempo de parede de uma etapa do job."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + time.monotonic() - start
+    
+    @staticmethod
+    def _percentile(values: List[float], pct: float) -> Optional[float]:
+        if not values:
+            return None
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+    
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            cache_total = self.cache_hits + self.cache_misses
+            request_time = sum(self.latencies)
+            return {
+                "wall_time_s": round(time.monotonic() - self.started_at, 3),
+                "stages_s": {name: round(seconds, 3) for name, seconds in self.stages.items()},
+                "requests": self.requests,
+                "failures": self.failures,
+                "status_codes": {str(code): count for code, count in sorted(self.status_codes.items())},
+                "bytes_received": self.bytes_received,
+                "latency_s": {
+                    f"p{pct}": round(value, 4) if value is not None else None
+                    for pct in (50, 90, 99)
+                    for value in [self._percentile(self.latencies, pct)]
+                },
+                "cache": {
+                    "hits": self.cache_hits,
+                    "misses": self.cache_misses,
+                    "hit_rate": round(self.cache_hits / cache_total, 3) if cache_total else None,
+                },
+                "parse_s": {
+                    "pages": len(self.parse_times),
+                    "total": round(sum(self.parse_times), 3),
+                    "mean": round(sum(self.parse_times) / len(self.parse_times), 4) if self.parse_times else None,
+                },
+                # Somas entre todas as threads: dormindo no limitador vs. esperando a rede
+                "thread_time_s": {"sleeping": round(self.sleep_time, 3), "requesting": round(request_time, 3)},
+            }
+    
+    def report_lines(self) -> List[str]:
+        """Resumo legível para o log do diálogo."""
+        data = self.summary()
+        latency = data["latency_s"]
+        hit_rate = data["cache"]["hit_rate"]
+        lines = [
+            f"⏱️ Tempo total: {data['wall_time_s']:.1f}s ("
+            + ", ".join(f"{name}: {seconds:.1f}s" for name, seconds in data["stages_s"].items()) + ")",
+            f"🌐 Requisições: {data['requests']} ({data['failures']} falhas), "
+            f"{data['bytes_received'] / 1024:.0f} KB recebidos",
+            "📊 Status HTTP: " + (", ".join(f"{code}={count}" for code, count in data["status_codes"].items()) or "-"),
+        ]
+        if latency["p50"] is not None:
+            lines.append(f"📈 Latência p50/p90/p99: {latency['p50']:.2f}s / {latency['p90']:.2f}s / {latency['p99']:.2f}s")
+        lines.append(
+            f"💾 Cache: {data['cache']['hits']} acertos, {data['cache']['misses']} faltas"
+            + (f" ({hit_rate:.0%})" if hit_rate is not None else "")
+        )
+        if data["parse_s"]["pages"]:
+            lines.append(f"🧩 Parse: {data['parse_s']['pages']} páginas, média {data['parse_s']['mean'] * 1000:.1f} ms")
+        lines.append(
+            f"😴 Dormindo no limitador: {data['thread_time_s']['sleeping']:.1f}s | "
+            f"esperando a rede: {data['thread_time_s']['requesting']:.1f}s"
+        )
+        return lines
+    
+    def write_json(self, path: Path) -> None:
+        with path.open(mode='w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+
+def metrics_path_for(csv_path: Path) -> Path:
+    """Resumo de métricas fica ao lado do CSV: resultado_x.csv -> resultado_x.metrics.json"""
+    return csv_path.with_suffix(".metrics.json")
+
+class ScrapingJournal:
+    """
+    Diário de checkpoint de um job de scraping (um arquivo JSONL por termo).
+    
+    Guarda o CSV de saída, os links coletados na etapa 1 e os links já
+    resolvidos na etapa 2, para que um job interrompido continue de onde parou.
+    """
+    
+    def __init__(self, path: Path, termo_busca: str, max_paginas: int, csv_path: Path) -> None:
+        self.path = path
         self.termo_busca = termo_busca
         self.max_paginas = max_paginas
-        self.is_running = True
+        self.csv_path = csv_path
+        self.links: Optional[List[str]] = None
+        self.done: Set[str] = set()
+        self.resumed = False
+        self._file = None
+    
+    @staticmethod
+    def path_for(termo_busca: str, directory: Path = JOURNAL_DIR) -> Path:
+        slug = re.sub(r'[^\w-]+', '_', termo_busca.strip().lower()) or "_"
+        return directory / f"{slug}.jsonl"
+    
+    @classmethod
+    def open(cls, termo_busca: str, max_paginas: int, csv_path: Path,
+             directory: Path = JOURNAL_DIR) -> "ScrapingJournal":
+        """Retoma o diário do termo se houver um compatível; senão inicia um novo."""
+        path = cls.path_for(termo_busca, directory)
+        if path.exists():
+            journal = cls._load(path)
+            if journal and journal.termo_busca == termo_busca and journal.max_paginas == max_paginas:
+                journal.resumed = True
+                return journal
+            path.unlink()
         
-    def run(self):
-        try:
-            resultado = self.realizar_scraping()
-            if resultado:
-                self.finished_signal.emit(f"✅ Scraping concluído!\nArquivo salvo em: {resultado}")
-            else:
-                self.finished_signal.emit("❌ Nenhum produto encontrado.")
-        except Exception as e:
-            self.error_signal.emit(f"❌ Erro no scraping: {str(e)}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        journal = cls(path, termo_busca, max_paginas, csv_path)
+        journal._append({"event": "start", "termo": termo_busca,
+                         "max_paginas": max_paginas, "csv": str(csv_path)})
+        return journal
+    
+    @classmethod
+    def _load(cls, path: Path) -> Optional["ScrapingJournal"]:
+        journal = None
+        with path.open(encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # Última linha truncada por um crash
+                
+                event = entry.get("event")
+                if event == "start":
+                    journal = cls(path, entry["termo"], entry["max_paginas"], Path(entry["csv"]))
+                elif journal is None:
+                    return None
+                elif event == "links":
+                    journal.links = entry["links"]
+                elif event == "done":
+                    journal.done.add(entry["link"])
+        return journal
+    
+    def _append(self, entry: dict) -> None:
+        if self._file is None:
+            self._file = self.path.open(mode='a', encoding='utf-8')
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+    
+    def record_links(self, links: List[str]) -> None:
+        """Registra o fim da etapa 1."""
+        self.links = list(links)
+        self._append({"event": "links", "links": self.links})
+    
+    def mark_done(self, link: str) -> None:
+        self.done.add(link)
+        self._append({"event": "done", "link": link})
+    
+    def pending_links(self) -> List[str]:
+        return [link for link in self.links or [] if link not in self.done]
+    
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def finish(self) -> None:
+        """Job concluído: o diário não é mais necessário."""
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+class ScraperAdapter(CachingAdapter):
+    """Adapter do scraper: cache em disco, métricas e limitador adaptativo para o que vai à rede."""
+    
+    def __init__(self, rate_limiter: AdaptiveRateLimiter, cache: Optional[ResponseCache] = None,
+                 metrics: Optional[ScraperMetrics] = None, **kwargs) -> None:
+        super().__init__(cache=cache, **kwargs)
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics or ScraperMetrics()
+    
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        response = super().send(request, **kwargs)
+        if self.cache is not None and request.method == "GET" and not kwargs.get("stream"):
+            self.metrics.record_cache(getattr(response, "from_cache", False))
+        return response
+    
+    def send_network(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        for attempt in range(THROTTLE_RETRIES + 1):
+            self.metrics.record_sleep(self.rate_limiter.acquire(request.url))  # Politeness
+            start = time.monotonic()
+            try:
+                response = super().send_network(request, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self.metrics.record_failure(time.monotonic() - start)
+                self.rate_limiter.record_failure(request.url)
+                raise
+            
+            latency = time.monotonic() - start
+            self.metrics.record_request(response.status_code, latency, self._transfer_size(request, response, kwargs))
+            self.rate_limiter.record(
+                request.url, response.status_code, latency,
+                response.headers.get("Retry-After"),
+            )
+            if response.status_code not in THROTTLE_STATUSES or attempt == THROTTLE_RETRIES:
+                return response
+            # 429/503: o limitador já reduziu a taxa e respeita o Retry-After no próximo acquire
+            response.close()
+        return response
+    
+    @staticmethod
+    def _transfer_size(request: requests.PreparedRequest, response: requests.Response, kwargs: dict) -> int:
+        """Bytes na rede: Content-Length (comprimido) ou, sem ele, o corpo lido. HEAD não tem corpo."""
+        if request.method == "HEAD":
+            return 0
+        length = response.headers.get("Content-Length")
+        if length and length.isdigit():
+            return int(length)
+        if kwargs.get("stream"):
+            return 0
+        return len(response.content)
+
+ProgressCallback = Callable[[int, int, str], None]  # (atual, total, mensagem)
+
+def _ignore_progress(atual: int, total: int, mensagem: str) -> None:
+    pass
+
+class ScrapingJob:
+    """Scraping de um termo, independente de Qt (usado pelo ScrapingWorker e pela CLI)"""
+    
+    def __init__(self, termo_busca: str, max_paginas: int, max_workers: int = DEFAULT_MAX_WORKERS,
+                 output_path: Optional[Path] = None, use_cache: bool = True,
+                 progress: ProgressCallback = _ignore_progress):
+        self.termo_busca = termo_busca
+        self.max_paginas = max_paginas
+        self.max_workers = max_workers
+        self.output_path = output_path
+        self.use_cache = use_cache
+        self.progress = progress
+        self.is_running = True
+        self._scraper: Optional["MagaluScraper"] = None
     
     def realizar_scraping(self):
-        """Executa o scraping e retorna o caminho do arquivo"""
-        nome_arquivo = f"resultado_{self.termo_busca}_{int(time.time())}.csv"
-        output_dir = Path("CSV")
-        output_dir.mkdir(parents=True, exist_ok=True)
-        file_path = output_dir / nome_arquivo
+        """Executa o scraping (retomando um job interrompido) e retorna o caminho do arquivo"""
+        file_path = self.output_path or Path("CSV") / f"resultado_{self.termo_busca}_{int(time.time())}.csv"
+        file_path.parent.mkdir(parents=True, exist_ok=True)
         
-        scraper = MagaluScraper()
-        all_links = []
+        journal = ScrapingJournal.open(self.termo_busca, self.max_paginas, file_path)
+        try:
+            cache = ResponseCache(CACHE_DIR) if self.use_cache else None
+            with MagaluScraper(max_workers=self.max_workers, cache=cache) as scraper:
+                self._scraper = scraper
+                resultado = self._executar(scraper, journal)
+                self.reportar_metricas(scraper.metrics, journal.csv_path if resultado else None)
+                return resultado
+        finally:
+            journal.close()
+    
+    def reportar_metricas(self, metrics: ScraperMetrics, csv_path: Optional[Path]):
+        """Envia o resumo de métricas ao log e grava o JSON ao lado do CSV"""
+        for linha in metrics.report_lines():
+            self.progress(0, 0, linha)
+        if csv_path:
+            metrics.write_json(metrics_path_for(csv_path))
+    
+    def _executar(self, scraper: "MagaluScraper", journal: ScrapingJournal):
+        file_path = journal.csv_path
         
-        # Etapa 1: Coleta de Links
-        for pagina in range(1, self.max_paginas + 1):
+        # Etapa 1: Coleta de Links (páginas em paralelo, mescladas na ordem)
+        if journal.links is None:
+            self.progress(0, self.max_paginas * 2, f"Buscando {self.max_paginas} página(s)...")
+            with scraper.metrics.stage("coleta"):
+                all_links = scraper.collect_search_links(
+                    query=self.termo_busca,
+                    max_pages=self.max_paginas,
+                    on_page=lambda pagina, total_links: self.progress(
+                        pagina, self.max_paginas * 2, f"Página {pagina}: {total_links} links"
+                    ),
+                    should_stop=lambda: not self.is_running,
+                )
             if not self.is_running:
-                break
-                
-            self.progress_signal.emit(pagina, self.max_paginas * 2, f"Buscando página {pagina}...")
-            
-            links_pagina = scraper.get_search_links(query=self.termo_busca, page=pagina)
-            
-            if not links_pagina:
-                break
-                
-            all_links.extend(links_pagina)
-            time.sleep(1.5)
+                return None
+            journal.record_links(all_links)
+        else:
+            all_links = journal.links
+            self.progress(
+                self.max_paginas, self.max_paginas * 2,
+                f"Retomando job anterior: {len(journal.done)} de {len(all_links)} produtos já processados"
+            )
         
         # Etapa 2: Extração de Produtos
         if all_links and self.is_running:
-            self.progress_signal.emit(self.max_paginas, self.max_paginas * 2, f"Extraindo {len(all_links)} produtos...")
+            pending_links = journal.pending_links()
+            self.progress(self.max_paginas, self.max_paginas * 2, f"Extraindo {len(pending_links)} produtos...")
             
-            data_gen = scraper.deep_scrape_products(all_links)
             fieldnames = [field.name for field in ProductRecord.__dataclass_fields__.values()]
+            append = file_path.exists()
             
             try:
-                with file_path.open(mode='w', newline='', encoding='utf-8') as csvfile:
+                with scraper.metrics.stage("extracao"), \
+                        file_path.open(mode='a' if append else 'w', newline='', encoding='utf-8') as csvfile:
                     writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    writer.writeheader()
+                    if not append:
+                        writer.writeheader()
                     
-                    count = 0
-                    for record in data_gen:
+                    count = len(journal.done)
+                    for link, record in scraper.iter_resolved_products(pending_links):
                         if not self.is_running:
                             break
-                            
-                        writer.writerow(asdict(record))
+                        
+                        if record:
+                            writer.writerow(asdict(record))
+                            csvfile.flush()
+                        # Checkpoint só depois da linha estar no CSV
+                        journal.mark_done(link)
                         count += 1
                         
                         # Atualiza progresso a cada 10 produtos
                         if count % 10 == 0:
-                            self.progress_signal.emit(
+                            self.progress(
                                 self.max_paginas + count, 
                                 self.max_paginas * 2 + len(all_links), 
                                 f"Extraídos {count} produtos..."
                             )
                     
-                    return str(file_path)
+                if self.is_running:
+                    journal.finish()
+                return str(file_path)
                     
             except IOError as e:
                 raise Exception(f"Erro ao salvar arquivo: {e}")
         
+        if self.is_running:
+            journal.finish()
         return None
     
     def stop(self):
         """Para a execução do scraping"""
         self.is_running = False
+        # Depois de is_running: resultados de requisições abortadas são descartados
+        if self._scraper is not None:
+            self._scraper.cancel()
+
+class BatchScrapingJob:
+    """Scraping de vários termos com pool e limite de taxa compartilhados, independente de Qt"""
+    
+    def __init__(self, termos: List[str], max_paginas: int, max_workers: int = DEFAULT_MAX_WORKERS,
+                 output_dir: Optional[Path] = None, use_cache: bool = True,
+                 progress: ProgressCallback = _ignore_progress):
+        self.termos = list(dict.fromkeys(t.strip() for t in termos if t.strip()))
+        self.max_paginas = max_paginas
+        self.max_workers = max_workers
+        self.output_dir = output_dir or Path("CSV")
+        self.use_cache = use_cache
+        self.progress = progress
+        self.is_running = True
+        self._scraper: Optional["MagaluScraper"] = None
+    
+    def realizar_scraping(self) -> List[str]:
+        """Executa o lote e retorna os CSVs por termo seguidos do CSV combinado"""
+        timestamp = int(time.time())
+        output_dir = self.output_dir
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Um único scraper: todos os termos dividem o mesmo pool, cache e orçamento por host
+        cache = ResponseCache(CACHE_DIR) if self.use_cache else None
+        with MagaluScraper(max_workers=self.max_workers, cache=cache) as scraper:
+            self._scraper = scraper
+            arquivos = self._executar(scraper, output_dir, timestamp)
+            
+            for linha in scraper.metrics.report_lines():
+                self.progress(0, 0, linha)
+            if arquivos:
+                # O último arquivo é o CSV combinado
+                scraper.metrics.write_json(metrics_path_for(Path(arquivos[-1])))
+            return arquivos
+    
+    def _executar(self, scraper: "MagaluScraper", output_dir: Path, timestamp: int) -> List[str]:
+        total_termos = len(self.termos)
+        link_terms: Dict[str, List[str]] = {}  # link -> termos em que apareceu
+        
+        # Etapa 1: Coleta de Links de cada termo
+        for indice, termo in enumerate(self.termos, start=1):
+            if not self.is_running:
+                return []
+            
+            with scraper.metrics.stage("coleta"):
+                links = scraper.collect_search_links(
+                    query=termo,
+                    max_pages=self.max_paginas,
+                    should_stop=lambda: not self.is_running,
+                )
+            for link in links:
+                link_terms.setdefault(link, []).append(termo)
+            
+            self.progress(indice, total_termos * 2, f"[{termo}] {len(links)} links")
+        
+        if not link_terms or not self.is_running:
+            return []
+        
+        # Etapa 2: Cada link único é resolvido uma só vez e distribuído aos termos
+        self.progress(
+            total_termos, total_termos * 2,
+            f"Extraindo {len(link_terms)} produtos únicos de {total_termos} termos..."
+        )
+        fieldnames = [field.name for field in ProductRecord.__dataclass_fields__.values()]
+        term_paths = {termo: output_dir / f"resultado_{termo}_{timestamp}.csv" for termo in self.termos}
+        combined_path = output_dir / f"resultado_lote_{timestamp}.csv"
+        
+        try:
+            with scraper.metrics.stage("extracao"), ExitStack() as stack:
+                term_writers: Dict[str, csv.DictWriter] = {}
+                
+                def writer_for(termo: str) -> csv.DictWriter:
+                    if termo not in term_writers:
+                        csvfile = stack.enter_context(
+                            term_paths[termo].open(mode='w', newline='', encoding='utf-8')
+                        )
+                        term_writers[termo] = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                        term_writers[termo].writeheader()
+                    return term_writers[termo]
+                
+                combined_file = stack.enter_context(combined_path.open(mode='w', newline='', encoding='utf-8'))
+                combined_writer = csv.DictWriter(combined_file, fieldnames=["termo_busca"] + fieldnames)
+                combined_writer.writeheader()
+                seen_ids: Set[str] = set()
+                
+                count = 0
+                for link, record in scraper.iter_resolved_products(list(link_terms)):
+                    if not self.is_running:
+                        break
+                    
+                    count += 1
+                    if record:
+                        row = asdict(record)
+                        for termo in link_terms[link]:
+                            writer_for(termo).writerow(row)
+                        if record.product_id not in seen_ids:
+                            seen_ids.add(record.product_id)
+                            combined_writer.writerow({"termo_busca": link_terms[link][0], **row})
+                    
+                    # Atualiza progresso a cada 10 produtos
+                    if count % 10 == 0:
+                        self.progress(
+                            total_termos + count,
+                            total_termos * 2 + len(link_terms),
+                            f"Extraídos {count} produtos ({len(seen_ids)} IDs únicos)..."
+                        )
+                
+                written = [str(term_paths[termo]) for termo in self.termos if termo in term_writers]
+                
+        except IOError as e:
+            raise Exception(f"Erro ao salvar arquivo: {e}")
+        
+        return written + [str(combined_path)]
+    
+    def stop(self):
+        """Para a execução do scraping"""
+        self.is_running = False
+        # Depois de is_running: resultados de requisições abortadas são descartados
+        if self._scraper is not None:
+            self._scraper.cancel()
 
 class MagaluScraper:
     """Gerencia a sessão e a lógica de extração."""
     
-    def __init__(self) -> None:
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS,
+                 rate_per_host: float = DEFAULT_RATE_PER_HOST,
+                 cache: Optional[ResponseCache] = None,
+                 base_url: str = BASE_URL) -> None:
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = AdaptiveRateLimiter(rate_per_host)
+        self.metrics = ScraperMetrics()
+        self.cache = cache
+        self.base_url = base_url
         self.session = self._setup_session()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+    
+    def __enter__(self) -> "MagaluScraper":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def cancel(self) -> None:
+        """Interrompe as esperas do limitador: as requisições ainda não enviadas falham."""
+        self.rate_limiter.close()
+    
+    def close(self) -> None:
+        """Encerra o pool de threads e a sessão HTTP."""
+        self.cancel()  # Sem isso o shutdown esperaria os Retry-After pendentes
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
     
     def _setup_session(self) -> requests.Session:
         session = requests.Session()
         session.headers.update({"User-Agent": USER_AGENT})
-        retries = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-        adapter = HTTPAdapter(max_retries=retries)
+        # 429/503 ficam com o ScraperAdapter, que os repassa ao limitador adaptativo
+        retries = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 504],
+                        respect_retry_after_header=False)
+        adapter = ScraperAdapter(
+            self.rate_limiter, cache=self.cache, metrics=self.metrics,
+            max_retries=retries, pool_maxsize=self.max_workers
+        )
         session.mount("https://", adapter)
         session.mount("http://", adapter)
         return session
     
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Pool compartilhado por todas as etapas do scraper (criado sob demanda)."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="magalu"
+                )
+            return self._executor
+    
+    def _imap_ordered(self, func: Callable[[T], R], items: Iterable[T]) -> Generator[R, None, None]:
+        """Aplica `func` no pool mantendo a ordem e no máximo 2x `max_workers` tarefas pendentes."""
+        if self.max_workers == 1:
+            for item in items:
+                yield func(item)
+            return
+        
+        executor = self._get_executor()
+        window = self.max_workers * 2
+        pending = deque()
+        try:
+            for item in items:
+                pending.append(executor.submit(func, item))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # Consumidor interrompido (ex.: cancelamento): descarta o que não começou
+            for future in pending:
+                future.cancel()
+    
     def _extract_id_from_url(self, url: str) -> Optional[str]:
         match = ID_PATTERN.search(url)
         return match.group(1) if match else None
     
     def get_search_links(self, query: str, page: int = 1) -> List[str]:
         """Obtém links da página de busca."""
-        search_url = f"{BASE_URL}/busca/{query}/"
+        search_url = f"{self.base_url}/busca/{query}/"
         params = {"page": page, "sortOrientation": "asc", "sortType": "price", "bypass": "true"}
         
         try:
             response = self.session.get(search_url, params=params, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            links = {a['href'] for a in soup.find_all('a', href=True) if '/p/' in a['href']}
-            
-            return list(links)
+            start = time.perf_counter()
+            links = extract_product_links(response.content)
+            self.metrics.record_parse(time.perf_counter() - start)
+            return links
         except requests.exceptions.RequestException:
             return []
     
-    def deep_scrape_products(self, product_links: List[str]) -> Generator[ProductRecord, None, None]:
-        """Visita cada produto e gera um ProductRecord."""
-        for partial_link in product_links:
-            full_url = urljoin(BASE_URL, partial_link)
-            time.sleep(1.0)  # Politeness
-            
-            try:
-                response = self.session.get(full_url, timeout=10)
-                if response.status_code != 200:
-                    continue
-                
-                final_url = response.url
-                product_id = self._extract_id_from_url(final_url)
-                
-                if product_id:
-                    yield ProductRecord(product_id=product_id)
-                    
-            except requests.exceptions.RequestException:
-                continue
-
-class ScrapingDialog(QDialog):
-    """Janela de diálogo para configuração do scraping"""
-    
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("Scraping - Magazine Luiza")
-        self.setFixedSize(500, 400)
-        
-        self.worker = None
-        self.setup_ui()
-    
-    def setup_ui(self):
-        """Configura a interface do diálogo"""
-        layout = QVBoxLayout(self)
-        layout.setSpacing(15)
-        
-        # Título
-        title_label = QLabel("📊 Scraping Magazine Luiza")
-        title_label.setStyleSheet("font-size: 16pt; font-weight: bold;")
-        title_label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(title_label)
-        
-        # Instruções
-        info_label = QLabel("Extraia IDs de produtos da Magazine Luiza")
-        info_label.setAlignment(Qt.AlignCenter)
-        info_label.setStyleSheet("color: gray;")
-        layout.addWidget(info_label)
-        
-        # Campo de busca
-        layout.addWidget(QLabel("Termo de busca:"))
-        self.termo_input = QLineEdit()
-        self.termo_input.setPlaceholderText("Ex: monitor, notebook, celular...")
-        layout.addWidget(self.termo_input)
-        
-        # Número de páginas
-        paginas_layout = QHBoxLayout()
-        paginas_layout.addWidget(QLabel("Número de páginas:"))
-        self.paginas_spin = QSpinBox()
-        self.paginas_spin.setRange(1, 10)
-        self.paginas_spin.setValue(3)
-        paginas_layout.addWidget(self.paginas_spin)
-        paginas_layout.addStretch()
-        layout.addLayout(paginas_layout)
-        
-        # Barra de progresso
-        layout.addWidget(QLabel("Progresso:"))
-        self.progress_bar = QProgressBar()
-        layout.addWidget(self.progress_bar)
-        
-        # Log de execução
-        layout.addWidget(QLabel("Log:"))
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
-        self.log_text.setMaximumHeight(150)
-        layout.addWidget(self.log_text)
-        
-        # Botões
-        button_layout = QHBoxLayout()
+    def collect_search_links(self, query: str, max_pages: int,
+                             on_page: Optional[Callable[[int, int], None]] = None,
+                             should_stop: Optional[Callable[[], bool]] = None) -> List[str]:
+        """
+        Busca as páginas 1..max_pages em paralelo e junta os links na ordem das páginas.
         
-        self.start_button = QPushButton("▶️ Iniciar Scraping")
-        self.start_button.clicked.connect(self.iniciar_scraping)
-        button_layout.addWidget(self.start_button)
+        A primeira página vazia encerra a coleta: as páginas seguintes ainda não
+        iniciadas são canceladas e as já baixadas são descartadas.
+        """
+        executor = self._get_executor()
+        pending: Dict[int, "Future[List[str]]"] = {}
+        next_page = 1
+        merged: Dict[str, None] = {}  # dict preserva a ordem e remove duplicados
         
-        self.cancel_button = QPushButton("⏹️ Cancelar")
-        self.cancel_button.clicked.connect(self.cancelar_scraping)
-        self.cancel_button.setEnabled(False)
-        button_layout.addWidget(self.cancel_button)
-        
-        self.close_button = QPushButton("❌ Fechar")
-        self.close_button.clicked.connect(self.close)
-        button_layout.addWidget(self.close_button)
+        try:
+            for page in range(1, max_pages + 1):
+                # Mantém no máximo `max_workers` páginas à frente da que está sendo consumida
+                while next_page <= max_pages and next_page < page + self.max_workers:
+                    pending[next_page] = executor.submit(self.get_search_links, query, next_page)
+                    next_page += 1
+                
+                if should_stop and should_stop():
+                    break
+                
+                links = pending.pop(page).result()
+                if on_page:
+                    on_page(page, len(links))
+                if not links:
+                    break
+                
+                merged.update(dict.fromkeys(links))
+        finally:
+            for future in pending.values():
+                future.cancel()
         
-        layout.addLayout(button_layout)
+        return list(merged)
     
-    def log(self, mensagem: str):
-        """Adiciona mensagem ao log"""
-        self.log_text.append(f"[{time.strftime('%H:%M:%S')}] {mensagem}")
+    def deep_scrape_products(self, product_links: List[str]) -> Generator[ProductRecord, None, None]:
+        """Resolve o ID de cada produto (até `max_workers` em paralelo) e gera um ProductRecord."""
+        for _, record in self.iter_resolved_products(product_links):
+            if record:
+                yield record
     
-    def iniciar_scraping(self):
-        """Inicia o processo de scraping"""
-        termo = self.termo_input.text().strip()
-        
-        if not termo:
-            QMessageBox.warning(self, "Aviso", "Digite um termo de busca!")
-            return
-        
-        # Desabilita controles durante a execução
-        self.termo_input.setEnabled(False)
-        self.paginas_spin.setEnabled(False)
-        self.start_button.setEnabled(False)
-        self.cancel_button.setEnabled(True)
-        
-        # Limpa log anterior
-        self.log_text.clear()
-        self.progress_bar.setValue(0)
-        
-        self.log(f"Iniciando scraping para: '{termo}'")
-        self.log(f"Páginas a serem buscadas: {self.paginas_spin.value()}")
-        
-        # Cria e inicia worker
-        self.worker = ScrapingWorker(termo, self.paginas_spin.value())
-        self.worker.progress_signal.connect(self.atualizar_progresso)
-        self.worker.finished_signal.connect(self.scraping_concluido)
-        self.worker.error_signal.connect(self.scraping_erro)
-        self.worker.start()
-    
-    def atualizar_progresso(self, atual: int, total: int, mensagem: str):
-        """Atualiza barra de progresso e log"""
-        if total > 0:
-            self.progress_bar.setMaximum(total)
-            self.progress_bar.setValue(atual)
-        
-        if mensagem:
-            self.log(mensagem)
+    def iter_resolved_products(self, product_links: List[str]
+                               ) -> Generator[Tuple[str, Optional[ProductRecord]], None, None]:
+        """Como `deep_scrape_products`, mas gera (link, record ou None) para cada link."""
+        return self._imap_ordered(lambda link: (link, self._resolve_product(link)), product_links)
     
-    def scraping_concluido(self, mensagem: str):
-        """Processa conclusão do scraping"""
-        self.log(mensagem)
-        self.restaurar_controles()
+    def _resolve_product(self, partial_link: str) -> Optional[ProductRecord]:
+        # Caminho rápido: o link da busca já traz /p/<id>/, nenhuma requisição é necessária
+        product_id = self._extract_id_from_url(partial_link)
+        if product_id:
+            return ProductRecord(product_id=product_id)
         
-        QMessageBox.information(self, "Concluído", mensagem)
+        final_url = self._resolve_final_url(urljoin(self.base_url, partial_link))
+        product_id = self._extract_id_from_url(final_url) if final_url else None
+        return ProductRecord(product_id=product_id) if product_id else None
     
-    def scraping_erro(self, mensagem: str):
-        """Processa erro no scraping"""
-        self.log(mensagem)
-        self.restaurar_controles()
-        
-        QMessageBox.critical(self, "Erro", mensagem)
-    
-    def cancelar_scraping(self):
-        """Cancela o scraping em andamento"""
-        if self.worker and self.worker.isRunning():
-            self.worker.stop()
-            self.worker.wait()
-            self.log("Scraping cancelado pelo usuário")
-            self.restaurar_controles()
-    
-    def restaurar_controles(self):
-        """Restaura controles para estado inicial"""
-        self.termo_input.setEnabled(True)
-        self.paginas_spin.setEnabled(True)
-        self.start_button.setEnabled(True)
-        self.cancel_button.setEnabled(False)
-        self.worker = None
-    
-    def closeEvent(self, event):
-        """Trata o fechamento da janela"""
-        if self.worker and self.worker.isRunning():
-            reply = QMessageBox.question(
-                self, "Scraping em andamento",
-                "O scraping ainda está em execução. Deseja realmente cancelar?",
-                QMessageBox.Yes | QMessageBox.No
-            )
-            
-            if reply == QMessageBox.Yes:
-                self.cancelar_scraping()
-                event.accept()
-            else:
-                event.ignore()
-        else:
-            event.accept()
+    def _resolve_final_url(self, full_url: str) -> Optional[str]:
+        """Segue os redirecionamentos sem baixar o corpo da página."""
+        try:
+            response = self.session.head(full_url, allow_redirects=True, timeout=10)
+            if response.status_code in (405, 501):
+                # Servidor não aceita HEAD: GET em modo stream, fechado antes de ler o corpo
+                with self.session.get(full_url, stream=True, timeout=10) as response:
+                    pass
+            if response.status_code != 200:
+                return None
+            return response.url
+        except requests.exceptions.RequestException:
+            return None
+
+# Qt só é importado quando a interface é usada (a CLI roda sem PySide6)
+_GUI_NAMES = ("ScrapingWorker", "BatchScrapingWorker", "ScrapingDialog")
+
+def __getattr__(name: str):
+    if name in _GUI_NAMES:
+        import scraping_page
+        return getattr(scraping_page, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Função para ser chamada pelo botão na home
 def abrir_scraping_magalu(parent=None):
     """Abre a janela de scraping - chamada pelo botão na home"""
+    from scraping_page import ScrapingDialog
+    
     dialog = ScrapingDialog(parent)
     dialog.exec()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entrada de linha de comando: roda o scraper sem o loop de eventos do Qt"""
+    parser = argparse.ArgumentParser(
+        description="Extrai IDs de produtos da Magazine Luiza sem interface gráfica."
+    )
+    parser.add_argument("-t", "--termo", action="append", default=[],
+                        help="Termo de busca (repita a opção para vários termos)")
+    parser.add_argument("--arquivo-termos", type=Path,
+                        help="Arquivo de texto com um termo por linha")
+    parser.add_argument("-p", "--paginas", type=int, default=3,
+                        help="Número de páginas de busca por termo (padrão: 3)")
+    parser.add_argument("-c", "--concorrencia", type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f"Requisições simultâneas (padrão: {DEFAULT_MAX_WORKERS})")
+    parser.add_argument("-o", "--saida", type=Path,
+                        help="CSV de saída (um termo) ou pasta de saída (vários termos)")
+    parser.add_argument("--sem-cache", action="store_true",
+                        help="Não usa o cache HTTP em disco")
+    args = parser.parse_args(argv)
+    
+    termos = list(args.termo)
+    if args.arquivo_termos:
+        with args.arquivo_termos.open(encoding='utf-8') as f:
+            termos.extend(linha.strip() for linha in f if linha.strip())
+    if not termos:
+        parser.error("informe ao menos um --termo ou --arquivo-termos")
+    
+    def progress(atual: int, total: int, mensagem: str) -> None:
+        print(f"[{time.strftime('%H:%M:%S')}] {mensagem}", file=sys.stderr)
+    
+    if len(termos) == 1:
+        job = ScrapingJob(termos[0], args.paginas, args.concorrencia, output_path=args.saida,
+                          use_cache=not args.sem_cache, progress=progress)
+    else:
+        job = BatchScrapingJob(termos, args.paginas, args.concorrencia, output_dir=args.saida,
+                               use_cache=not args.sem_cache, progress=progress)
+    
+    try:
+        resultado = job.realizar_scraping()
+    except KeyboardInterrupt:
+        # Só o job de um termo tem diário para retomar
+        if isinstance(job, ScrapingJob):
+            print("Interrompido: execute novamente para retomar o job.", file=sys.stderr)
+        else:
+            print("Interrompido.", file=sys.stderr)
+        return 130
+    
+    if not resultado:
+        print("Nenhum produto encontrado.", file=sys.stderr)
+        return 1
+    
+    print("\n".join(resultado) if isinstance(resultado, list) else resultado)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
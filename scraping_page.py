@@ -0,0 +1,287 @@
+import time
+from typing import List
+
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
+                              QLineEdit, QPushButton, QSpinBox, QTextEdit,
+                              QProgressBar, QMessageBox, QCheckBox, QPlainTextEdit,
+                              QFileDialog)
+from PySide6.QtCore import Qt, QThread, Signal
+
+from scraping import DEFAULT_MAX_WORKERS, BatchScrapingJob, ScrapingJob
+
+class ScrapingWorker(QThread):
+    """Thread para execução do scraping em background"""
+    progress_signal = Signal(int, int, str)  # (atual, total, mensagem)
+    finished_signal = Signal(str)  # mensagem final
+    error_signal = Signal(str)  # mensagem de erro
+    
+    def __init__(self, termo_busca: str, max_paginas: int, max_workers: int = DEFAULT_MAX_WORKERS):
+        super().__init__()
+        self.job = ScrapingJob(termo_busca, max_paginas, max_workers, progress=self.progress_signal.emit)
+        
+    def run(self):
+        try:
+            resultado = self.job.realizar_scraping()
+            if resultado:
+                self.finished_signal.emit(f"✅ Scraping concluído!\nArquivo salvo em: {resultado}")
+            else:
+                self.finished_signal.emit("❌ Nenhum produto encontrado.")
+        except Exception as e:
+            self.error_signal.emit(f"❌ Erro no scraping: {str(e)}")
+    
+    def stop(self):
+        """Para a execução do scraping"""
+        self.job.stop()
+
+class BatchScrapingWorker(QThread):
+    """Thread para scraping de vários termos com pool e limite de taxa compartilhados"""
+    progress_signal = Signal(int, int, str)  # (atual, total, mensagem)
+    finished_signal = Signal(str)  # mensagem final
+    error_signal = Signal(str)  # mensagem de erro
+    
+    def __init__(self, termos: List[str], max_paginas: int, max_workers: int = DEFAULT_MAX_WORKERS):
+        super().__init__()
+        self.job = BatchScrapingJob(termos, max_paginas, max_workers, progress=self.progress_signal.emit)
+    
+    def run(self):
+        try:
+            arquivos = self.job.realizar_scraping()
+            if arquivos:
+                self.finished_signal.emit(
+                    f"✅ Scraping em lote concluído!\nArquivos salvos:\n" + "\n".join(arquivos)
+                )
+            else:
+                self.finished_signal.emit("❌ Nenhum produto encontrado.")
+        except Exception as e:
+            self.error_signal.emit(f"❌ Erro no scraping: {str(e)}")
+    
+    def stop(self):
+        """Para a execução do scraping"""
+        self.job.stop()
+
+class ScrapingDialog(QDialog):
+    """Janela de diálogo para configuração do scraping"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Scraping - Magazine Luiza")
+        self.setFixedSize(500, 560)
+        
+        self.worker = None
+        self.setup_ui()
+    
+    def setup_ui(self):
+        """Configura a interface do diálogo"""
+        layout = QVBoxLayout(self)
+        layout.setSpacing(15)
+        
+        # Título
+        title_label = QLabel("📊 Scraping Magazine Luiza")
+        title_label.setStyleSheet("font-size: 16pt; font-weight: bold;")
+        title_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title_label)
+        
+        # Instruções
+        info_label = QLabel("Extraia IDs de produtos da Magazine Luiza")
+        info_label.setAlignment(Qt.AlignCenter)
+        info_label.setStyleSheet("color: gray;")
+        layout.addWidget(info_label)
+        
+        # Campo de busca
+        layout.addWidget(QLabel("Termo de busca:"))
+        self.termo_input = QLineEdit()
+        self.termo_input.setPlaceholderText("Ex: monitor, notebook, celular...")
+        layout.addWidget(self.termo_input)
+        
+        # Modo lote: vários termos, um por linha
+        lote_layout = QHBoxLayout()
+        self.lote_check = QCheckBox("Vários termos (um por linha)")
+        self.lote_check.toggled.connect(self.alternar_modo_lote)
+        lote_layout.addWidget(self.lote_check)
+        lote_layout.addStretch()
+        self.carregar_button = QPushButton("📂 Carregar arquivo...")
+        self.carregar_button.clicked.connect(self.carregar_termos)
+        lote_layout.addWidget(self.carregar_button)
+        layout.addLayout(lote_layout)
+        
+        self.termos_input = QPlainTextEdit()
+        self.termos_input.setPlaceholderText("monitor\nnotebook\ncelular")
+        self.termos_input.setMaximumHeight(90)
+        layout.addWidget(self.termos_input)
+        self.alternar_modo_lote(False)
+        
+        # Número de páginas
+        paginas_layout = QHBoxLayout()
+        paginas_layout.addWidget(QLabel("Número de páginas:"))
+        self.paginas_spin = QSpinBox()
+        self.paginas_spin.setRange(1, 10)
+        self.paginas_spin.setValue(3)
+        paginas_layout.addWidget(self.paginas_spin)
+        paginas_layout.addStretch()
+        paginas_layout.addWidget(QLabel("Requisições simultâneas:"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 32)
+        self.workers_spin.setValue(DEFAULT_MAX_WORKERS)
+        paginas_layout.addWidget(self.workers_spin)
+        layout.addLayout(paginas_layout)
+        
+        # Barra de progresso
+        layout.addWidget(QLabel("Progresso:"))
+        self.progress_bar = QProgressBar()
+        layout.addWidget(self.progress_bar)
+        
+        # Log de execução
+        layout.addWidget(QLabel("Log:"))
+        self.log_text = QTextEdit()
+        self.log_text.setReadOnly(True)
+        self.log_text.setMaximumHeight(150)
+        layout.addWidget(self.log_text)
+        
+        # Botões
+        button_layout = QHBoxLayout()
+        
+        self.start_button = QPushButton("▶️ Iniciar Scraping")
+        self.start_button.clicked.connect(self.iniciar_scraping)
+        button_layout.addWidget(self.start_button)
+        
+        self.cancel_button = QPushButton("⏹️ Cancelar")
+        self.cancel_button.clicked.connect(self.cancelar_scraping)
+        self.cancel_button.setEnabled(False)
+        button_layout.addWidget(self.cancel_button)
+        
+        self.close_button = QPushButton("❌ Fechar")
+        self.close_button.clicked.connect(self.close)
+        button_layout.addWidget(self.close_button)
+        
+        layout.addLayout(button_layout)
+    
+    def alternar_modo_lote(self, ativo: bool):
+        """Alterna entre termo único e lista de termos"""
+        self.termo_input.setVisible(not ativo)
+        self.termos_input.setVisible(ativo)
+        self.carregar_button.setEnabled(ativo)
+    
+    def carregar_termos(self):
+        """Carrega termos de um arquivo de texto (um por linha)"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Selecione o arquivo de termos",
+            "",
+            "Text Files (*.txt *.csv);;All Files (*)"
+        )
+        
+        if not file_path:
+            return
+        
+        try:
+            with open(file_path, encoding='utf-8') as f:
+                termos = [linha.strip() for linha in f if linha.strip()]
+            self.termos_input.setPlainText("\n".join(termos))
+        except (OSError, UnicodeDecodeError) as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao ler arquivo de termos: {str(e)}")
+    
+    def log(self, mensagem: str):
+        """Adiciona mensagem ao log"""
+        self.log_text.append(f"[{time.strftime('%H:%M:%S')}] {mensagem}")
+    
+    def iniciar_scraping(self):
+        """Inicia o processo de scraping"""
+        if self.lote_check.isChecked():
+            termos = [t.strip() for t in self.termos_input.toPlainText().splitlines() if t.strip()]
+        else:
+            termos = [self.termo_input.text().strip()] if self.termo_input.text().strip() else []
+        
+        if not termos:
+            QMessageBox.warning(self, "Aviso", "Digite um termo de busca!")
+            return
+        
+        # Desabilita controles durante a execução
+        self.termo_input.setEnabled(False)
+        self.termos_input.setEnabled(False)
+        self.lote_check.setEnabled(False)
+        self.carregar_button.setEnabled(False)
+        self.paginas_spin.setEnabled(False)
+        self.workers_spin.setEnabled(False)
+        self.start_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        
+        # Limpa log anterior
+        self.log_text.clear()
+        self.progress_bar.setValue(0)
+        
+        if self.lote_check.isChecked():
+            self.log(f"Iniciando scraping em lote para {len(termos)} termos: {', '.join(termos)}")
+        else:
+            self.log(f"Iniciando scraping para: '{termos[0]}'")
+        self.log(f"Páginas a serem buscadas: {self.paginas_spin.value()}")
+        self.log(f"Requisições simultâneas: {self.workers_spin.value()}")
+        
+        # Cria e inicia worker
+        if self.lote_check.isChecked():
+            self.worker = BatchScrapingWorker(termos, self.paginas_spin.value(), self.workers_spin.value())
+        else:
+            self.worker = ScrapingWorker(termos[0], self.paginas_spin.value(), self.workers_spin.value())
+        self.worker.progress_signal.connect(self.atualizar_progresso)
+        self.worker.finished_signal.connect(self.scraping_concluido)
+        self.worker.error_signal.connect(self.scraping_erro)
+        self.worker.start()
+    
+    def atualizar_progresso(self, atual: int, total: int, mensagem: str):
+        """Atualiza barra de progresso e log"""
+        if total > 0:
+            self.progress_bar.setMaximum(total)
+            self.progress_bar.setValue(atual)
+        
+        if mensagem:
+            self.log(mensagem)
+    
+    def scraping_concluido(self, mensagem: str):
+        """Processa conclusão do scraping"""
+        self.log(mensagem)
+        self.restaurar_controles()
+        
+        QMessageBox.information(self, "Concluído", mensagem)
+    
+    def scraping_erro(self, mensagem: str):
+        """Processa erro no scraping"""
+        self.log(mensagem)
+        self.restaurar_controles()
+        
+        QMessageBox.critical(self, "Erro", mensagem)
+    
+    def cancelar_scraping(self):
+        """Cancela o scraping em andamento"""
+        if self.worker and self.worker.isRunning():
+            self.worker.stop()
+            self.worker.wait()
+            self.log("Scraping cancelado pelo usuário")
+            self.restaurar_controles()
+    
+    def restaurar_controles(self):
+        """Restaura controles para estado inicial"""
+        self.termo_input.setEnabled(True)
+        self.termos_input.setEnabled(True)
+        self.lote_check.setEnabled(True)
+        self.carregar_button.setEnabled(self.lote_check.isChecked())
+        self.paginas_spin.setEnabled(True)
+        self.workers_spin.setEnabled(True)
+        self.start_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.worker = None
+    
+    def closeEvent(self, event):
+        """Trata o fechamento da janela"""
+        if self.worker and self.worker.isRunning():
+            reply = QMessageBox.question(
+                self, "Scraping em andamento",
+                "O scraping ainda está em execução. Deseja realmente cancelar?",
+                QMessageBox.Yes | QMessageBox.No
+            )
+            
+            if reply == QMessageBox.Yes:
+                self.cancelar_scraping()
+                event.accept()
+            else:
+                event.ignore()
+        else:
+            event.accept()